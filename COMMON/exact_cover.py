@@ -0,0 +1,173 @@
+class ExactCover:
+    # Dancing Links (Knuth's Algorithm X) over flat node arrays.
+    # Node 0 is the root, nodes 1..num_columns are column headers and every row
+    # adds one node per covered column. Primary columns must be covered exactly
+    # once; secondary columns (numbered after the primary ones) at most once.
+    def __init__(self, num_columns, num_secondary=0):
+        total = num_columns + num_secondary
+        self.num_columns = total
+        self.left = list(range(-1, total))
+        self.right = list(range(1, total + 2))
+        self.left[0] = num_columns
+        self.right[num_columns] = 0
+        for col in range(num_columns + 1, total + 1):
+            self.left[col] = self.right[col] = col
+        self.up = list(range(total + 1))
+        self.down = list(range(total + 1))
+        self.column = list(range(total + 1))
+        self.row = [-1] * (total + 1)
+        self.size = [0] * (total + 1)
+        self.labels = []
+        self.nodes = 0
+
+    def add_row(self, columns, label=None):
+        # columns are 0-based; returns False if the row covers a column twice
+        if len(set(columns)) != len(columns):
+            return False
+
+        row_id = len(self.labels)
+        self.labels.append(label if label is not None else row_id)
+        first = len(self.column)
+
+        for offset, col in enumerate(columns):
+            header = col + 1
+            node = first + offset
+            self.column.append(header)
+            self.row.append(row_id)
+            self.left.append(node - 1 if offset else first + len(columns) - 1)
+            self.right.append(node + 1 if offset < len(columns) - 1 else first)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.size[header] += 1
+
+        return True
+
+    def cover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def choose_column(self):
+        # Knuth's S heuristic: the primary column with the fewest remaining rows
+        right, size = self.right, self.size
+        best = right[0]
+        best_size = size[best]
+        col = right[best]
+        while col != 0 and best_size > 1:
+            if size[col] < best_size:
+                best, best_size = col, size[col]
+            col = right[col]
+        return best
+
+    def search(self, partial):
+        if self.right[0] == 0:
+            yield [self.labels[self.row[node]] for node in partial]
+            return
+
+        self.nodes += 1
+        col = self.choose_column()
+        if self.size[col] == 0:
+            return
+
+        # try/finally keeps the links consistent when the caller stops iterating early
+        self.cover(col)
+        try:
+            node = self.down[col]
+            while node != col:
+                partial.append(node)
+                j = self.right[node]
+                while j != node:
+                    self.cover(self.column[j])
+                    j = self.right[j]
+
+                try:
+                    yield from self.search(partial)
+                finally:
+                    j = self.left[node]
+                    while j != node:
+                        self.uncover(self.column[j])
+                        j = self.left[j]
+                    partial.pop()
+                node = self.down[node]
+        finally:
+            self.uncover(col)
+
+    def solutions(self, limit=None):
+        # Yields each solution as the list of labels of the chosen rows.
+        # Stopping early (limit or closing the generator) leaves the matrix intact.
+        found = 0
+        search = self.search([])
+        try:
+            for solution in search:
+                yield solution
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        finally:
+            search.close()
+
+    def solve(self):
+        return next(self.solutions(limit=1), None)
+
+    def count(self, limit=None):
+        # Counting does not build label lists, so it is noticeably faster than
+        # len(list(solutions()))
+        self.count_limit = limit
+        return self.count_search(0)
+
+    def count_search(self, found):
+        right, size, column, down, left = self.right, self.size, self.column, self.down, self.left
+        if right[0] == 0:
+            return found + 1
+
+        self.nodes += 1
+        col = self.choose_column()
+        if size[col] == 0:
+            return found
+
+        self.cover(col)
+        node = down[col]
+        while node != col:
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+
+            found = self.count_search(found)
+
+            j = left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = left[j]
+            if self.count_limit is not None and found >= self.count_limit:
+                break
+            node = down[node]
+        self.uncover(col)
+        return found
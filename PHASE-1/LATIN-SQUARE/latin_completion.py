@@ -0,0 +1,104 @@
+import argparse
+import sys
+import time
+
+from latin_square import LatinPropagationSolver
+
+
+def read_instances(stream):
+    # Instances are blocks of rows separated by blank lines; entries are numbers
+    # separated by spaces with 0 or '.' for an empty cell; '#' starts a comment.
+    # Yields one partial square at a time, as rows of unparsed entries, so input of
+    # any size streams through and a bad entry only spoils its own instance.
+    rows = []
+    for line in stream:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            rows.append(line.split())
+            continue
+        if rows:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+def parse_instance(rows):
+    # Raises ValueError for an entry that is neither '.' nor an integer
+    return [[0 if entry == "." else int(entry) for entry in row] for row in rows]
+
+
+def check_instance(matrix):
+    n = len(matrix)
+    if any(len(row) != n for row in matrix):
+        return "rows must all have length n"
+    if any(num < 0 or num > n for row in matrix for num in row):
+        return f"entries must be between 0 and {n}"
+    return None
+
+
+def complete_instance(matrix, timeout):
+    # Returns (status, seconds, nodes); matrix is completed in place when solved
+    problem = check_instance(matrix)
+    if problem:
+        print(f"Invalid instance: {problem}", file=sys.stderr)
+        return "invalid", 0.0, 0
+
+    start = time.perf_counter()
+    solver = LatinPropagationSolver(matrix, start + timeout if timeout else None)
+    try:
+        status = "solved" if solver.solve() else "unsat"
+    except TimeoutError:
+        status = "timeout"
+    return status, time.perf_counter() - start, solver.nodes
+
+
+def complete_batch(stream, output, timeout=10.0, solutions=None):
+    counts = {}
+    start = time.perf_counter()
+    output.write("instance,order,status,seconds,nodes\n")
+
+    for index, rows in enumerate(read_instances(stream), 1):
+        try:
+            matrix = parse_instance(rows)
+        except ValueError as error:
+            print(f"Invalid instance: {error}", file=sys.stderr)
+            matrix, status, seconds, nodes = rows, "invalid", 0.0, 0
+        else:
+            status, seconds, nodes = complete_instance(matrix, timeout)
+        counts[status] = counts.get(status, 0) + 1
+        output.write(f"{index},{len(matrix)},{status},{seconds:.6f},{nodes}\n")
+        output.flush()
+
+        if solutions is not None and status == "solved":
+            solutions.write(f"# instance {index}\n")
+            for row in matrix:
+                solutions.write(" ".join(map(str, row)) + "\n")
+            solutions.write("\n")
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"{sum(counts.values())} instances ({summary}) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Complete partial Latin squares (quasigroup completion).")
+    parser.add_argument("input", nargs="?", default="-", help="instance file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="CSV status file, '-' for stdout")
+    parser.add_argument("-t", "--timeout", type=float, default=10.0, help="seconds per instance, 0 for none")
+    parser.add_argument("-s", "--solutions", help="file for completed squares, in the input format")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    solutions = open(args.solutions, "w") if args.solutions else None
+    try:
+        complete_batch(stream, output, args.timeout, solutions)
+    finally:
+        for handle in (stream, output, solutions):
+            if handle is not None and handle not in (sys.stdin, sys.stdout):
+                handle.close()
+
+
+if __name__ == "__main__":
+    main()
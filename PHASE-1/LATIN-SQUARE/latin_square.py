@@ -1,3 +1,13 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "COMMON"))
+from exact_cover import ExactCover
+
+
 def is_safe(num, row, col, used_rows, used_cols):
     return not used_rows[row][num] and not used_cols[col][num]
 
@@ -45,6 +55,289 @@ def iddfs_latin_square(n):
 
     print("\nNo solution exists for the given Latin square size with IDDFS.")
 
+def latin_square_exact_cover(n, matrix=None):
+    # Columns: n*n cells, then symbol-in-row and symbol-in-column (n*n each).
+    # Non-zero entries of an optional partial matrix are kept as givens.
+    cover = ExactCover(3 * n * n)
+    for row in range(n):
+        for col in range(n):
+            given = matrix[row][col] if matrix else 0
+            for num in ([given] if given else range(1, n + 1)):
+                cover.add_row([row * n + col, n * n + row * n + num - 1,
+                               2 * n * n + col * n + num - 1], (row, col, num))
+    return cover
+
+def enumerate_latin_squares(n, matrix=None, limit=None):
+    for solution in latin_square_exact_cover(n, matrix).solutions(limit):
+        square = [[0] * n for _ in range(n)]
+        for row, col, num in solution:
+            square[row][col] = num
+        yield square
+
+def count_latin_squares(n, matrix=None, limit=None):
+    return latin_square_exact_cover(n, matrix).count(limit)
+
+def solve_latin_square(matrix):
+    # Completes a partial square in place (0 = empty) with row/column bitmasks
+    # and most-constrained-cell branching; no depth iterations
+    n = len(matrix)
+    full = ((1 << n) - 1) << 1
+    row_masks = [0] * n
+    col_masks = [0] * n
+    empty_cells = []
+
+    for row in range(n):
+        for col in range(n):
+            num = matrix[row][col]
+            if num == 0:
+                empty_cells.append((row, col))
+                continue
+            bit = 1 << num
+            if (row_masks[row] | col_masks[col]) & bit:
+                return False
+            row_masks[row] |= bit
+            col_masks[col] |= bit
+
+    return backtrack_mrv(matrix, empty_cells, full, row_masks, col_masks)
+
+def backtrack_mrv(matrix, empty_cells, full, row_masks, col_masks):
+    if not empty_cells:
+        return True
+
+    best_index, best_free, best_count = 0, 0, full.bit_count() + 1
+    for index, (row, col) in enumerate(empty_cells):
+        free = full & ~(row_masks[row] | col_masks[col])
+        count = free.bit_count()
+        if count < best_count:
+            best_index, best_free, best_count = index, free, count
+            if count <= 1:
+                break
+
+    row, col = empty_cells[best_index]
+    empty_cells[best_index] = empty_cells[-1]
+    empty_cells.pop()
+
+    free = best_free
+    while free:
+        bit = free & -free
+        free ^= bit
+        matrix[row][col] = bit.bit_length() - 1
+        row_masks[row] |= bit
+        col_masks[col] |= bit
+
+        if backtrack_mrv(matrix, empty_cells, full, row_masks, col_masks):
+            return True
+
+        row_masks[row] ^= bit
+        col_masks[col] ^= bit
+
+    matrix[row][col] = 0
+    empty_cells.append((row, col))
+    empty_cells[best_index], empty_cells[-1] = empty_cells[-1], empty_cells[best_index]
+    return False
+
+class LatinPropagationSolver:
+    # Quasigroup completion: per-cell candidate bitsets, naked and hidden singles
+    # over rows and columns, MRV branching and a trail for undo
+    def __init__(self, matrix, deadline=None):
+        n = len(matrix)
+        self.n = n
+        self.matrix = matrix
+        self.full = ((1 << n) - 1) << 1
+        self.units = [[row * n + col for col in range(n)] for row in range(n)] + \
+                     [[row * n + col for row in range(n)] for col in range(n)]
+        self.peers = [[row * n + c for c in range(n) if c != col] + [r * n + col for r in range(n) if r != row]
+                      for row in range(n) for col in range(n)]
+        self.cells = [0] * (n * n)
+        self.candidates = [self.full] * (n * n)
+        self.trail = []
+        self.deadline = deadline
+        self.nodes = 0
+        self.consistent = all(
+            self.assign(row * n + col, matrix[row][col])
+            for row in range(n) for col in range(n) if matrix[row][col]
+        )
+
+    def assign(self, cell, num):
+        pending = [(cell, num)]
+        while pending:
+            cell, num = pending.pop()
+            if self.cells[cell]:
+                if self.cells[cell] != num:
+                    return False
+                continue
+
+            bit = 1 << num
+            if not self.candidates[cell] & bit:
+                return False
+            self.trail.append((cell, self.candidates[cell]))
+            self.cells[cell] = num
+            self.candidates[cell] = bit
+
+            for peer in self.peers[cell]:
+                mask = self.candidates[peer]
+                if not mask & bit:
+                    continue
+                if self.cells[peer]:
+                    return False
+                mask ^= bit
+                if not mask:
+                    return False
+                self.trail.append((peer, self.candidates[peer]))
+                self.candidates[peer] = mask
+                if not mask & (mask - 1):
+                    pending.append((peer, mask.bit_length() - 1))
+        return True
+
+    def propagate(self):
+        # Hidden singles to a fixpoint: a symbol with one possible cell in a line goes there
+        changed = True
+        while changed:
+            changed = False
+            for unit in self.units:
+                seen_once = seen_twice = 0
+                for cell in unit:
+                    mask = self.candidates[cell]
+                    seen_twice |= seen_once & mask
+                    seen_once |= mask
+                if seen_once != self.full:
+                    return False
+
+                singles = seen_once & ~seen_twice
+                for cell in unit:
+                    mask = self.candidates[cell] & singles
+                    if mask and not self.cells[cell]:
+                        if mask & (mask - 1) or not self.assign(cell, mask.bit_length() - 1):
+                            return False
+                        changed = True
+        return True
+
+    def undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            cell, mask = trail.pop()
+            self.candidates[cell] = mask
+            self.cells[cell] = 0
+
+    def search(self):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % 256 == 0 and time.perf_counter() > self.deadline:
+            raise TimeoutError("search deadline exceeded")
+        if not self.propagate():
+            return False
+
+        best_cell, best_count = None, self.n + 1
+        for cell, num in enumerate(self.cells):
+            if num:
+                continue
+            count = self.candidates[cell].bit_count()
+            if count < best_count:
+                best_cell, best_count = cell, count
+                if count == 2:
+                    break
+        if best_cell is None:
+            return True
+
+        free = self.candidates[best_cell]
+        while free:
+            bit = free & -free
+            free ^= bit
+            mark = len(self.trail)
+            if self.assign(best_cell, bit.bit_length() - 1) and self.search():
+                return True
+            self.undo(mark)
+        return False
+
+    def solve(self):
+        if not self.consistent or not self.search():
+            return False
+        for cell, num in enumerate(self.cells):
+            self.matrix[cell // self.n][cell % self.n] = num
+        return True
+
+def direct_latin_square(n):
+    matrix = [[0] * n for _ in range(n)]
+    for i in range(n):
+        matrix[i][i] = i + 1
+
+    if solve_latin_square(matrix):
+        print_matrix(matrix)
+    else:
+        print("\nNo solution exists for the given Latin square size.")
+
+def second_row_classes(n):
+    # Second rows of reduced squares (symbols 0..n-1, first row and column in
+    # order) are permutations p with p[0] == 1 and p[c] != c. Relabelling symbols,
+    # rows and columns by the same sigma fixing 0 and 1 maps reduced squares to
+    # reduced squares and p to sigma p sigma^-1, so squares only need to be
+    # counted for one second row per class, weighted by the class size.
+    classes = {}
+    relabellings = [(0, 1) + rest for rest in permutations(range(2, n))]
+
+    for tail in permutations([0] + list(range(2, n))):
+        row = (1,) + tail
+        if any(row[col] == col for col in range(n)):
+            continue
+        if row in classes:
+            continue
+
+        orbit = set()
+        for sigma in relabellings:
+            conjugate = [0] * n
+            for col in range(n):
+                conjugate[sigma[col]] = sigma[row[col]]
+            orbit.add(tuple(conjugate))
+        representative = min(orbit)
+        for member in orbit:
+            classes[member] = representative
+
+    weights = {}
+    for representative in classes.values():
+        weights[representative] = weights.get(representative, 0) + 1
+    return weights
+
+def count_reduced_completions(second_row):
+    # Counts reduced squares with the given second row. Rows are filled left to
+    # right; any (n-1) x n Latin rectangle completes uniquely, so the search
+    # stops one row early.
+    n = len(second_row)
+    full = (1 << n) - 1
+    col_masks = [(1 << col) | (1 << second_row[col]) for col in range(n)]
+    col_masks[0] = full
+    if n <= 3:
+        return 1
+
+    def fill(row, col, row_mask):
+        if col == n:
+            if row == n - 2:
+                return 1
+            row += 1
+            return fill(row, 1, 1 << row)
+
+        total = 0
+        free = full & ~(row_mask | col_masks[col])
+        while free:
+            bit = free & -free
+            free ^= bit
+            col_masks[col] |= bit
+            total += fill(row, col + 1, row_mask | bit)
+            col_masks[col] ^= bit
+        return total
+
+    return fill(2, 1, 1 << 2)
+
+def count_reduced_latin_squares(n, workers=None):
+    # Reduced squares have first row and first column 1..n; the total number of
+    # Latin squares is n! * (n-1)! times this count
+    if n <= 2:
+        return 1
+
+    weights = second_row_classes(n)
+    representatives = sorted(weights)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = pool.map(count_reduced_completions, representatives)
+        return sum(weights[row] * count for row, count in zip(representatives, counts))
+
 def print_matrix(matrix):
     print("\nFinal Solution:")
     for row in matrix:
@@ -62,7 +355,23 @@ def main():
             print(f"Invalid input: {e}. Please try again.")
             continue
 
-        iddfs_latin_square(square_number)
+        print("\nChoose the mode: ")
+        print("1. Build one square with IDDFS")
+        print("2. Count all Latin squares with Dancing Links")
+        print("3. Build one square directly (bitmasks + MRV)")
+        print("4. Count reduced Latin squares (symmetry-reduced, parallel)")
+        mode = input("Your choice (1/2/3/4): ").strip()
+        if mode == '2':
+            print(f"\nThere are {count_latin_squares(square_number)} Latin squares of order {square_number}.")
+        elif mode == '3':
+            direct_latin_square(square_number)
+        elif mode == '4':
+            start = time.perf_counter()
+            reduced = count_reduced_latin_squares(square_number)
+            print(f"\nThere are {reduced} reduced Latin squares of order {square_number} "
+                  f"({time.perf_counter() - start:.2f}s).")
+        else:
+            iddfs_latin_square(square_number)
 
         try_again = input("\nSolve another Latin square? (y/n): ").strip().lower()
         if try_again not in ["yes", "y"]:
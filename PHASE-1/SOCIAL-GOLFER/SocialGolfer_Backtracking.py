@@ -1,14 +1,23 @@
+from golfer_pairs import PairTracker, golfer_bit, group_mask
+from golfer_stats import SearchStats
+
 #Parameters
 weeks = 5
 groups = 8
 group_size = 4
 golfers = groups * group_size  #Total number of golfers
+progress_every = 0  # seconds between progress lines on stderr, 0 = off
+trace_path = None  # file for the per-probe trace, None = off
 
-played_pairs = set()
+pairs = PairTracker(golfers)
+week_members = [0] * weeks  # bitmask of the golfers already placed in each week
+stats = None
 
 def main():
 
+    global stats
     schedule = [[[0 for _ in range(group_size)] for _ in range(groups)] for _ in range(weeks)]
+    stats = SearchStats(weeks * groups * group_size, progress_every, trace_path)
 
     if backtrack(0, 0, 0, schedule):
         print("\nSolution found:")
@@ -16,6 +25,7 @@ def main():
         validate_solution(schedule)
     else:
         print("No solution found.")
+    stats.report("Search", groups * group_size)
 
 
 def backtrack(week, group, slot, schedule):
@@ -30,44 +40,41 @@ def backtrack(week, group, slot, schedule):
         return backtrack(week + 1, 0, 0, schedule)
 
 
+    position = (week * groups + group) * group_size + slot
     for golfer in range(1, golfers + 1):
-        print(f"Trying golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+        stats.node(position)
+        if stats.trace_file:
+            stats.trace(f"Trying golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
 
         if is_valid(golfer, week, group, slot, schedule):
             schedule[week][group][slot] = golfer
-            print(f"Placed golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            if stats.trace_file:
+                stats.trace(f"Placed golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
 
             if backtrack(week, group, slot + 1, schedule):
                 return True
 
-            print(f"Backtracking from golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            if stats.trace_file:
+                stats.trace(f"Backtracking from golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            stats.backtrack()
             schedule[week][group][slot] = 0
             remove_played_pairs(golfer, week, group, schedule)  # Undo the pair tracking
-        else:
-            print(f"Golfer {golfer} is not valid for Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+        elif stats.trace_file:
+            stats.trace(f"Golfer {golfer} is not valid for Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
 
     return False
 
 
 def is_valid(golfer, week, group, slot, schedule):
-    print("Current played pairs:", played_pairs)
-
-    for g in range(groups):
-        for s in range(group_size):
-            if schedule[week][g][s] == golfer:
-                return False
-
-    for s in range(slot):
-        other_golfer = schedule[week][group][s]
-        pair = generate_pair(golfer, other_golfer)
-        if pair in played_pairs:
-            return False
+    if week_members[week] & golfer_bit(golfer):
+        return False
 
-    for s in range(slot):
-        other_golfer = schedule[week][group][s]
-        pair = generate_pair(golfer, other_golfer)
-        played_pairs.add(pair)
+    mask = group_mask(schedule[week][group], slot)
+    if not pairs.can_join(golfer, mask):
+        return False
 
+    pairs.join(golfer, mask)
+    week_members[week] |= golfer_bit(golfer)
     return True
 
 
@@ -76,10 +83,9 @@ def generate_pair(golfer1, golfer2):
 
 
 def remove_played_pairs(golfer, week, group, schedule):
-    for s in range(group_size):
-        if schedule[week][group][s] != 0:
-            pair = generate_pair(golfer, schedule[week][group][s])
-            played_pairs.discard(pair)
+    # Called after the golfer's slot was reset, so the group mask holds only the others
+    pairs.leave(golfer, group_mask(schedule[week][group], group_size))
+    week_members[week] &= ~golfer_bit(golfer)
 
 
 def print_solution(schedule):
@@ -1,52 +1,81 @@
+import time
+from collections import OrderedDict
+
+from golfer_pairs import PairTracker, golfer_bit, group_mask
+from golfer_stats import SearchStats
+
 # Parameters
 weeks = 5
 groups = 8
 group_size = 4
 golfers = groups * group_size
-max_depth = 160  # Maximum depth for DLS, weeks*groups*group_size
-
-
-played_pairs = set()
+progress_every = 0  # seconds between progress lines on stderr, 0 = off
+trace_path = None  # file for the per-probe trace, None = off
+max_depth = weeks  # Maximum depth for DLS, in complete weeks
+iterative = True  # iterative deepening over weeks 1..max_depth instead of a single DLS run
+cache_size = 100000  # dead-end prefixes kept in the transposition table
+prefix_cache_size = 1000  # completed prefixes kept for the next iteration to resume from
+canonical_leaves = 1000  # labellings compared per canonical_prefix call
+
+
+pairs = PairTracker(golfers)
+week_members = [0] * weeks  # bitmask of the golfers already placed in each week
+stats = None
+# canonical prefix of the first k weeks -> smallest week limit it could not be extended to
+dead_ends = OrderedDict()
+# canonical prefix of the first k weeks -> (k, copy of those weeks), least recently used first
+completed = OrderedDict()
+cache_hits = 0
+resumed = 0
 
 
 def main():
+    global stats
     schedule = [[[0 for _ in range(group_size)] for _ in range(groups)] for _ in range(weeks)]
+    stats = SearchStats(weeks * groups * group_size, progress_every, trace_path)
 
-    if dls(0, 0, 0, schedule, 0):
+    if iterative:
+        found = iterative_deepening(schedule)
+    else:
+        found = dls(0, 0, 0, schedule, 0, max_depth)
+
+    if found:
         print("\nSolution found:")
         print_solution(schedule)
         validate_solution(schedule)
     else:
         print("No solution found.")
+    stats.report("Search", groups * group_size)
 
 
-def dls(week, group, slot, schedule, depth):
-    # Base Case
-    if week == weeks:
+def dls(week, group, slot, schedule, depth, limit):
+    # depth counts complete weeks; the search succeeds once limit weeks are complete
+    if depth == limit:
         return True
 
-    if depth == max_depth:
-        print(f"Reached max depth ({max_depth}). Backtracking...")
-        return False
-
     if slot == group_size:
-        return dls(week, group + 1, 0, schedule, depth)
+        return dls(week, group + 1, 0, schedule, depth, limit)
 
     if group == groups:
-        return dls(week + 1, 0, 0, schedule, depth + 1)
+        return next_week(week, schedule, depth + 1, limit)
 
+    position = (week * groups + group) * group_size + slot
     for golfer in range(1, golfers + 1):
-        print(f"Trying golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
-        print(f"Current played pairs: {played_pairs}")
+        stats.node(position)
+        if stats.trace_file:
+            stats.trace(f"Trying golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
 
         if is_valid(golfer, week, group, slot, schedule):
             schedule[week][group][slot] = golfer
-            print(f"Placed golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            if stats.trace_file:
+                stats.trace(f"Placed golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
 
-            if dls(week, group, slot + 1, schedule, depth):
+            if dls(week, group, slot + 1, schedule, depth, limit):
                 return True
 
-            print(f"Backtracking from golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            if stats.trace_file:
+                stats.trace(f"Backtracking from golfer {golfer} in Week {week + 1}, Group {group + 1}, Slot {slot + 1}")
+            stats.backtrack()
             schedule[week][group][slot] = 0
             remove_played_pairs(golfer, week, group, schedule)
 
@@ -54,24 +83,194 @@ def dls(week, group, slot, schedule, depth):
     return False
 
 
-def is_valid(golfer, week, group, slot, schedule):
-    for g in range(groups):
-        for s in range(group_size):
-            if schedule[week][g][s] == golfer:
-                return False
-
-    for s in range(slot):
-        other_golfer = schedule[week][group][s]
-        pair = generate_pair(golfer, other_golfer)
-        if pair in played_pairs:
+def next_week(week, schedule, depth, limit):
+    # Every completed prefix is remembered for the next iteration to resume from.
+    # Prefixes that could not be extended to limit weeks (in this or an earlier,
+    # shallower iteration) are skipped, and every new dead end is remembered.
+    global cache_hits
+    key = canonical_prefix(schedule, depth)
+    completed[key] = (depth, [[list(group) for group in w] for w in schedule[:depth]])
+    completed.move_to_end(key)
+    if len(completed) > prefix_cache_size:
+        completed.popitem(last=False)
+
+    if depth == limit:
+        return True
+
+    failed = dead_ends.get(key)
+    if failed is not None and failed <= limit:
+        dead_ends.move_to_end(key)
+        cache_hits += 1
+        if stats.trace_file:
+            stats.trace(f"Skipping known dead end after Week {depth}")
+        return False
+
+    if dls(week + 1, 0, 0, schedule, depth, limit):
+        return True
+
+    dead_ends[key] = limit
+    dead_ends.move_to_end(key)
+    if len(dead_ends) > cache_size:
+        dead_ends.popitem(last=False)
+    return False
+
+
+def canonical_prefix(schedule, depth):
+    # Key of the first depth weeks that is the same for every relabelling of the
+    # golfers that keeps the week 1 groups and for every order of the later weeks.
+    # Colour refinement splits the golfers by their week 1 partners and later
+    # groups; tied golfers are individualised one at a time and the smallest
+    # relabelled schedule is the key. Two labellings giving the same schedule
+    # differ by an automorphism, which is used to skip branches already seen.
+    # Any key is the prefix under a valid relabelling, so the key stays exact if
+    # canonical_leaves cuts the search short; it is only shared less often.
+    if depth <= 1:
+        return ()
+    first = [tuple(group) for group in schedule[0]]
+    later = [[tuple(group) for group in week] for week in schedule[1:depth]]
+    seen = {}  # schedule -> (golfer of each label, golfers individualised) of its first labelling
+    automorphisms = []
+    leaves = 0
+
+    def search(color, path):
+        nonlocal leaves
+        color = refine_colors(color, first, later)
+        cells = {}
+        for golfer, value in color.items():
+            cells.setdefault(value, []).append(golfer)
+        tied = min((value for value, members in cells.items() if len(members) > 1), default=None)
+        if tied is None:
+            leaves += 1
+            key = relabelled(color, first, later)
+            if key not in seen:
+                seen[key] = ({value: golfer for golfer, value in color.items()}, path)
+                return None
+            golfer_of, other_path = seen[key]
+            automorphisms.append({golfer: golfer_of[value] for golfer, value in color.items()})
+            common = 0
+            while path[common] == other_path[common]:
+                common += 1
+            return common  # depth of the branch point to go back to
+        tried = []
+        for golfer in sorted(cells[tied]):
+            if leaves >= canonical_leaves:
+                return 0
+            if tried and golfer in same_orbit(tried, path):
+                continue
+            tried.append(golfer)
+            back = search({other: 2 * value + (other != golfer) for other, value in color.items()},
+                          path + [golfer])
+            if back is not None and back < len(path):
+                return back
+        return None
+
+    def same_orbit(golfers, path):
+        # Golfers reachable from golfers by the automorphisms that fix every golfer in path
+        orbit, queue = set(golfers), list(golfers)
+        fixing = [mapping for mapping in automorphisms if all(mapping[golfer] == golfer for golfer in path)]
+        while queue:
+            golfer = queue.pop()
+            for mapping in fixing:
+                if mapping[golfer] not in orbit:
+                    orbit.add(mapping[golfer])
+                    queue.append(mapping[golfer])
+        return orbit
+
+    search({golfer: 0 for group in first for golfer in group}, [])
+    return min(seen)
+
+
+def refine_colors(color, first, later):
+    # Colours are renumbered by rank after every round, so they never depend on
+    # the golfer numbers
+    first_group = {golfer: group for group in first for golfer in group}
+    later_groups = {golfer: [] for golfer in color}
+    for week in later:
+        for group in week:
+            for golfer in group:
+                later_groups[golfer].append(group)
+    count = len(set(color.values()))
+    while True:
+        signatures = {}
+        for golfer in color:
+            partners = tuple(sorted(color[other] for other in first_group[golfer] if other != golfer))
+            groups = tuple(sorted(tuple(sorted(color[other] for other in group if other != golfer))
+                                  for group in later_groups[golfer]))
+            signatures[golfer] = (color[golfer], partners, groups)
+        ranks = {signature: rank for rank, signature in enumerate(sorted(set(signatures.values())))}
+        color = {golfer: ranks[signature] for golfer, signature in signatures.items()}
+        if len(ranks) == count:
+            return color
+        count = len(ranks)
+
+
+def relabelled(color, first, later):
+    label = {golfer: value + 1 for golfer, value in color.items()}
+    return (tuple(sorted(tuple(sorted(label[golfer] for golfer in group)) for group in first)),
+            tuple(sorted(tuple(sorted(tuple(sorted(label[golfer] for golfer in group)) for group in week))
+                         for week in later)))
+
+
+def reset_search(schedule):
+    for week in schedule:
+        for group in week:
+            group[:] = [0] * group_size
+    pairs.partners[:] = [0] * len(pairs.partners)
+    week_members[:] = [0] * weeks
+
+
+def load_prefix(schedule, rows):
+    # Restores the search state of a completed prefix of len(rows) weeks
+    reset_search(schedule)
+    for week, groups_of_week in enumerate(rows):
+        for group, members in enumerate(groups_of_week):
+            for slot, golfer in enumerate(members):
+                pairs.join(golfer, group_mask(members, slot))
+                week_members[week] |= golfer_bit(golfer)
+            schedule[week][group][:] = members
+
+
+def resume(schedule, limit):
+    # Extends the cached prefixes of limit - 1 weeks by one week, most recent first,
+    # instead of rebuilding their weeks; a prefix that cannot be extended becomes a
+    # dead end, so the full search that follows a miss skips it
+    global resumed
+    for depth, rows in reversed(list(completed.values())):
+        if depth != limit - 1 or depth == 0:
+            continue
+        load_prefix(schedule, rows)
+        resumed += 1
+        if next_week(depth - 1, schedule, depth, limit):
+            return True
+    return False
+
+
+def iterative_deepening(schedule):
+    for limit in range(1, max_depth + 1):
+        start, nodes, hits, resumes = time.perf_counter(), stats.nodes, cache_hits, resumed
+        found = resume(schedule, limit)
+        if not found:
+            reset_search(schedule)
+            found = dls(0, 0, 0, schedule, 0, limit)
+        print(f"Iteration {limit}: {'found' if found else 'no'} schedule for {limit} weeks, "
+              f"{stats.nodes - nodes:,} nodes, {resumed - resumes:,} prefixes resumed, "
+              f"{cache_hits - hits:,} cache hits, {len(completed):,} cached prefixes, "
+              f"{len(dead_ends):,} cached dead ends, {time.perf_counter() - start:.3f}s")
+        if not found:
             return False
+    return True
+
 
+def is_valid(golfer, week, group, slot, schedule):
+    if week_members[week] & golfer_bit(golfer):
+        return False
 
-    for s in range(slot):
-        other_golfer = schedule[week][group][s]
-        pair = generate_pair(golfer, other_golfer)
-        played_pairs.add(pair)
+    mask = group_mask(schedule[week][group], slot)
+    if not pairs.can_join(golfer, mask):
+        return False
 
+    pairs.join(golfer, mask)
+    week_members[week] |= golfer_bit(golfer)
     return True
 
 
@@ -80,10 +279,9 @@ def generate_pair(golfer1, golfer2):
 
 
 def remove_played_pairs(golfer, week, group, schedule):
-    for s in range(group_size):
-        if schedule[week][group][s] != 0:
-            pair = generate_pair(golfer, schedule[week][group][s])
-            played_pairs.discard(pair)
+    # Called after the golfer's slot was reset, so the group mask holds only the others
+    pairs.leave(golfer, group_mask(schedule[week][group], group_size))
+    week_members[week] &= ~golfer_bit(golfer)
 
 def print_solution(schedule):
     for w in range(weeks):
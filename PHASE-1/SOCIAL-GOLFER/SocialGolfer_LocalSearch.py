@@ -0,0 +1,236 @@
+import argparse
+import random
+import time
+
+from SocialGolfer_Symmetry import print_solution, schedule_is_valid
+
+# Known limitation: solves 8-4-8 within a minute, but not 8-4-9 in any practical budget.
+
+
+class TabuSearch:
+    # Tabu search over full schedules. A move swaps two golfers from different
+    # groups of the same week; the cost is the number of repeated meetings,
+    # sum over pairs of max(0, weeks together - 1), kept in a pair-count matrix.
+    # met[w][golfer * groups + g] counts the golfers of group g in week w that
+    # golfer has met at least once (repeat[w] at least twice), so the delta of
+    # a swap is a handful of lookups.
+    def __init__(self, rows, rng, tenure=(1, 3), fixed_weeks=1):
+        self.rows = [[list(group) for group in week] for week in rows]
+        self.weeks = len(rows)
+        self.groups = len(rows[0])
+        self.group_size = len(rows[0][0])
+        self.golfers = self.groups * self.group_size
+        self.rng = rng
+        self.tenure = tenure
+        self.fixed_weeks = min(fixed_weeks, self.weeks)
+        self.tabu = {}
+        self.iterations = 0
+
+        size = (self.golfers + 1) * self.groups
+        self.where = [[None] * (self.golfers + 1) for _ in range(self.weeks)]
+        self.met = [[0] * size for _ in range(self.weeks)]
+        self.repeat = [[0] * size for _ in range(self.weeks)]
+        self.count = [[0] * (self.golfers + 1) for _ in range(self.golfers + 1)]
+        self.cost = 0
+        for w, week in enumerate(self.rows):
+            for g, group in enumerate(week):
+                for i, golfer in enumerate(group):
+                    self.place(w, golfer, g, group[:i])
+
+    def meet(self, golfer, other, change):
+        row = self.count[golfer]
+        before = row[other]
+        after = before + change
+        row[other] = after
+        self.count[other][golfer] = after
+        self.cost += max(0, after - 1) - max(0, before - 1)
+
+        groups = self.groups
+        for table, threshold in ((self.met, 1), (self.repeat, 2)):
+            step = (after >= threshold) - (before >= threshold)
+            if not step:
+                continue
+            for w in range(self.weeks):
+                g_golfer, g_other = self.where[w][golfer], self.where[w][other]
+                if g_other is not None:
+                    table[w][golfer * groups + g_other] += step
+                if g_golfer is not None:
+                    table[w][other * groups + g_golfer] += step
+
+    def place(self, w, golfer, g, members):
+        # Put golfer into group g of week w next to members (the rest of the group)
+        for member in members:
+            self.meet(golfer, member, 1)
+        self.where[w][golfer] = g
+        self.update_membership(w, golfer, g, 1)
+
+    def remove(self, w, golfer, members):
+        self.update_membership(w, golfer, self.where[w][golfer], -1)
+        self.where[w][golfer] = None
+        for member in members:
+            self.meet(golfer, member, -1)
+
+    def update_membership(self, w, golfer, g, step):
+        row, met, repeat, groups = self.count[golfer], self.met[w], self.repeat[w], self.groups
+        for other in range(1, self.golfers + 1):
+            times = row[other]
+            if times >= 1:
+                met[other * groups + g] += step
+                if times >= 2:
+                    repeat[other * groups + g] += step
+
+    def delta(self, w, golfer, other):
+        # Change in cost when golfer and other (in different groups of week w) swap
+        groups, met, repeat = self.groups, self.met[w], self.repeat[w]
+        a, b = self.where[w][golfer], self.where[w][other]
+        known = self.count[golfer][other] >= 1
+        return (met[golfer * groups + b] + met[other * groups + a] - 2 * known
+                - repeat[golfer * groups + a] - repeat[other * groups + b])
+
+    def conflicting(self, w):
+        repeat, where, groups = self.repeat[w], self.where[w], self.groups
+        return [golfer for golfer in range(1, self.golfers + 1) if repeat[golfer * groups + where[golfer]]]
+
+    def swap(self, w, golfer, other):
+        a, b = self.where[w][golfer], self.where[w][other]
+        group_a, group_b = self.rows[w][a], self.rows[w][b]
+        rest_a = [member for member in group_a if member != golfer]
+        rest_b = [member for member in group_b if member != other]
+        self.remove(w, golfer, rest_a)
+        self.remove(w, other, rest_b)
+        self.place(w, golfer, b, rest_b)
+        self.place(w, other, a, rest_a)
+        group_a[group_a.index(golfer)] = other
+        group_b[group_b.index(other)] = golfer
+
+    def best_move(self, best_cost):
+        # Same as minimizing delta() over every swap of a conflicting golfer, but
+        # the terms of the other golfer (met[other][a] - repeat[other][b]) only
+        # depend on the group a it moves into, so they are built once per group
+        # of conflicting golfers and shared by all of them
+        best, moves = None, []
+        groups, tabu, iterations = self.groups, self.tabu, self.iterations
+        for w in range(self.fixed_weeks, self.weeks):
+            met, repeat, where = self.met[w], self.repeat[w], self.where[w]
+            by_group = {}
+            for golfer in self.conflicting(w):
+                by_group.setdefault(where[golfer], []).append(golfer)
+
+            for a, golfers in by_group.items():
+                others = [other for other in range(1, self.golfers + 1) if where[other] != a]
+                other_groups = [where[other] for other in others]
+                terms = [met[other * groups + a] - repeat[other * groups + b] for other, b in zip(others, other_groups)]
+                for golfer in golfers:
+                    base = golfer * groups
+                    met_golfer, row, leave = met[base:base + groups], self.count[golfer], repeat[base + a]
+                    deltas = [met_golfer[b] + term - 2 * (row[other] >= 1) - leave
+                              for other, b, term in zip(others, other_groups, terms)]
+                    if best is not None and min(deltas) > best:
+                        continue
+                    for other, delta in zip(others, deltas):
+                        if best is not None and delta > best:
+                            continue
+                        key = (w, golfer, other) if golfer < other else (w, other, golfer)
+                        if tabu.get(key, 0) > iterations and self.cost + delta >= best_cost:
+                            continue
+                        if best is None or delta < best:
+                            best, moves = delta, []
+                        moves.append(key)
+        return self.rng.choice(moves) if moves else None
+
+    def run(self, max_iterations, stall=10000, deadline=None, stop=None):
+        # Returns True once the cost reaches 0; stops after stall iterations
+        # without a new best, at max_iterations, at the deadline or once stop is set
+        best_cost, since_best = self.cost, 0
+        while self.cost and since_best < stall and self.iterations < max_iterations:
+            if self.iterations % 64 == 0:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                if stop is not None and stop.is_set():
+                    break
+            self.iterations += 1
+            move = self.best_move(best_cost)
+            if move is None:
+                break
+            w, golfer, other = move
+            self.swap(w, golfer, other)
+            self.tabu[move] = self.iterations + self.rng.randint(*self.tenure)
+            if self.cost < best_cost:
+                best_cost, since_best = self.cost, 0
+            else:
+                since_best += 1
+        return self.cost == 0
+
+
+def first_week(groups, group_size):
+    return [list(range(g * group_size + 1, (g + 1) * group_size + 1)) for g in range(groups)]
+
+
+def random_schedule(weeks, groups, group_size, rng):
+    # The first week is fixed to 1-4, 5-8, ...; every other week is a random partition
+    rows = [first_week(groups, group_size)]
+    golfers = list(range(1, groups * group_size + 1))
+    for _ in range(1, weeks):
+        rng.shuffle(golfers)
+        rows.append([sorted(golfers[g * group_size:(g + 1) * group_size]) for g in range(groups)])
+    return rows
+
+
+def solve_local_search(weeks, groups, group_size, seed=None, budget=60.0, stall=10000,
+                       max_iterations=10 ** 6, tenure=(1, 3), start=None, stop=None):
+    # Runs tabu search from start (or a random schedule), restarting from a fresh
+    # random schedule after every stall until a schedule without repeats is found
+    # or the budget runs out. Returns (rows or None, best cost, iterations, restarts).
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + budget
+    rows = start or random_schedule(weeks, groups, group_size, rng)
+    best_cost = None
+    iterations = restarts = 0
+    while True:
+        search = TabuSearch(rows, rng, tenure)
+        solved = search.run(max_iterations - iterations, stall, deadline, stop)
+        iterations += search.iterations
+        if best_cost is None or search.cost < best_cost:
+            best_cost = search.cost
+        if solved:
+            return search.rows, 0, iterations, restarts
+        if iterations >= max_iterations or time.perf_counter() > deadline or (stop is not None and stop.is_set()):
+            return None, best_cost, iterations, restarts
+        restarts += 1
+        rows = random_schedule(weeks, groups, group_size, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabu search for Social Golfer schedules")
+    parser.add_argument("-g", "--groups", type=int, default=8)
+    parser.add_argument("-s", "--size", type=int, default=4, help="golfers per group")
+    parser.add_argument("-w", "--weeks", type=int, default=8)
+    parser.add_argument("-b", "--budget", type=float, default=120.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stall", type=int, default=10000, help="iterations without improvement before a restart")
+    parser.add_argument("--iterations", type=int, default=10 ** 6, help="total iteration limit")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows, cost, iterations, restarts = solve_local_search(
+        args.weeks, args.groups, args.size, args.seed, args.budget, args.stall, args.iterations)
+    elapsed = time.perf_counter() - start
+    instance = f"{args.groups}-{args.size}-{args.weeks}"
+    print(f"{instance}: {iterations:,} iterations, {restarts} restarts in {elapsed:.2f}s "
+          f"({iterations / elapsed if elapsed > 0 else 0:,.0f} iterations/sec)")
+
+    if rows is None:
+        print(f"No solution found; best schedule still has {cost} repeated meetings.")
+        return
+
+    rows = [sorted(map(sorted, week)) for week in rows]
+    print("\nSolution found:")
+    print_solution(rows)
+    if schedule_is_valid(rows, args.groups * args.size):
+        print("Solution is valid: No duplicate pairs or player conflicts.")
+    else:
+        print("Invalid: schedule has duplicate pairs or player conflicts.")
+
+
+if __name__ == "__main__":
+    main()
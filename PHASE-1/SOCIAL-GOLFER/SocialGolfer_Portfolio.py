@@ -0,0 +1,138 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from golfer_solver import GolferSolver, SearchAborted, solve_with_restarts
+from SocialGolfer_LocalSearch import solve_local_search
+from SocialGolfer_Symmetry import BudgetExceeded, SymmetrySolver, print_solution, schedule_is_valid
+
+VARIANTS = ("backtracking", "dls", "restarts", "symmetry", "tabu")
+
+stop_event = None  # set in every worker; raised once a solution is found in --first mode
+
+
+def init_worker(event):
+    global stop_event
+    stop_event = event
+
+
+def parse_instance(text):
+    # Instances are written groups-size-weeks, e.g. 8-4-10
+    groups, group_size, weeks = (int(part) for part in text.split("-"))
+    return groups, group_size, weeks
+
+
+def run_variant(instance, variant, budget, seed=None):
+    # Returns (instance, variant, status, complete weeks, nodes, seconds, schedule rows or None)
+    groups, group_size, weeks = instance
+    start = time.perf_counter()
+    deadline = start + budget
+
+    if variant == "tabu":
+        # Local search has no partial schedules: weeks is all or nothing, nodes are iterations
+        rows, _, nodes, _ = solve_local_search(weeks, groups, group_size, seed, budget,
+                                               max_iterations=10 ** 9, stop=stop_event)
+        if rows is not None:
+            status = "solved"
+        else:
+            status = "stopped" if stop_event is not None and stop_event.is_set() else "timeout"
+        best_weeks = weeks if rows is not None else 0
+        return check_result(instance, variant, status, best_weeks, nodes, start, rows)
+    if variant == "restarts":
+        status, solver, nodes, _, best_weeks = solve_with_restarts(
+            weeks, groups, group_size, seed, deadline=deadline, stop=stop_event)
+    else:
+        if variant == "symmetry":
+            solver = SymmetrySolver(groups, group_size, weeks, deadline=deadline, stop=stop_event)
+            aborted = BudgetExceeded
+        else:
+            # dls is iterative deepening over weeks, resuming from the previous limit's prefix
+            solver = GolferSolver(weeks, groups, group_size, deadline=deadline, stop=stop_event)
+            aborted = SearchAborted
+        try:
+            solve = solver.solve_deepening if variant == "dls" else solver.solve
+            status = "solved" if solve() else "no solution"
+        except aborted:
+            status = "stopped" if stop_event is not None and stop_event.is_set() else "timeout"
+        nodes, best_weeks = solver.stats.nodes, solver.best_weeks
+
+    rows = solver.to_rows() if status == "solved" else None
+    return check_result(instance, variant, status, best_weeks, nodes, start, rows)
+
+
+def check_result(instance, variant, status, best_weeks, nodes, start, rows):
+    groups, group_size, _ = instance
+    if rows is not None and not schedule_is_valid(rows, groups * group_size):
+        status, rows = "invalid", None
+    return instance, variant, status, best_weeks, nodes, time.perf_counter() - start, rows
+
+
+def run_portfolio(tasks, budget, workers=None, first=False, seed=None):
+    # tasks is a list of (instance, variant); with first=True the remaining tasks
+    # are cancelled and the running ones told to stop once any task finds a schedule.
+    # Results come back in the order the tasks finished.
+    workers = workers or os.cpu_count() or 1
+    event = multiprocessing.Event()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(event,)) as pool:
+        futures = [pool.submit(run_variant, instance, variant, budget, seed) for instance, variant in tasks]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result = future.result()
+            results.append(result)
+            if first and result[2] == "solved" and not event.is_set():
+                event.set()
+                for other in futures:
+                    other.cancel()
+    return results
+
+
+def print_summary(results, tasks):
+    order = {task: index for index, task in enumerate(tasks)}
+    results = sorted(results, key=lambda result: order[result[0], result[1]])
+    print(f"{'instance':<10} {'variant':<13} {'status':<12} {'weeks':>5} {'nodes':>12} {'seconds':>8}")
+    for (groups, group_size, weeks), variant, status, best_weeks, nodes, seconds, _ in results:
+        print(f"{f'{groups}-{group_size}-{weeks}':<10} {variant:<13} {status:<12} {best_weeks:>5} "
+              f"{nodes:>12,} {seconds:>8.2f}")
+
+    # Feasible frontier: the most weeks solved for each groups-size pair
+    frontier = {}
+    for (groups, group_size, weeks), _, status, *_ in results:
+        if status == "solved":
+            frontier[groups, group_size] = max(frontier.get((groups, group_size), 0), weeks)
+    for (groups, group_size), weeks in sorted(frontier.items()):
+        print(f"{groups}-{group_size}: solved up to {weeks} weeks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Social Golfer instances and search variants in parallel.")
+    parser.add_argument("-i", "--instances", nargs="+", default=["8-4-5", "8-4-6", "8-4-7"],
+                        help="instances as groups-size-weeks")
+    parser.add_argument("-v", "--variants", nargs="+", choices=VARIANTS, default=["backtracking", "dls", "restarts", "symmetry"])
+    parser.add_argument("-b", "--budget", type=float, default=30.0, help="seconds per task")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--first", action="store_true", help="stop at the first schedule found and print it")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the randomized restarts")
+    args = parser.parse_args()
+
+    tasks = [(parse_instance(text), variant) for text in args.instances for variant in args.variants]
+    results = run_portfolio(tasks, args.budget, args.workers, args.first, args.seed)
+
+    if args.first:
+        # The first schedule found, in the order the tasks finished
+        for (groups, group_size, weeks), variant, status, _, nodes, seconds, rows in results:
+            if status == "solved":
+                print(f"{groups}-{group_size}-{weeks} solved by {variant} ({nodes:,} nodes, {seconds:.2f}s):")
+                print_solution(rows)
+                return
+        print("No solution found.")
+        return
+
+    print_summary(results, tasks)
+
+
+if __name__ == "__main__":
+    main()
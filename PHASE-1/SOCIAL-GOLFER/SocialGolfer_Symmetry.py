@@ -0,0 +1,206 @@
+import argparse
+import time
+
+from golfer_pairs import PairTracker, golfer_bit, golfers_in
+from golfer_stats import CHECK_EVERY, SearchStats
+
+# Symmetry-breaking features, in the order the configurations switch them on:
+#   ascending     golfers within a group are placed in increasing order
+#   order_groups  groups are ordered by their first golfer (the smallest unplaced golfer opens the next group)
+#   fix_week      the first week is fixed to 1-4, 5-8, ...
+#   fix_column    in later weeks golfers 1..group_size open groups 1..group_size, and the
+#                 weeks are ordered by the second golfer of group 1
+#   value_order   value ordering: try the golfers with the fewest unplaced golfers they have not met
+#                 first, and prune weeks where a golfer can no longer be grouped. The slot filled
+#                 next is still the next slot of the current group.
+FEATURES = ("ascending", "order_groups", "fix_week", "fix_column", "value_order")
+CONFIGURATIONS = [("plain", ())] + [(feature, FEATURES[:i + 1]) for i, feature in enumerate(FEATURES)]
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class SymmetrySolver:
+    def __init__(self, groups, group_size, weeks, features=FEATURES, deadline=None, stop=None):
+        self.groups = groups
+        self.group_size = group_size
+        self.weeks = weeks
+        self.golfers = groups * group_size
+        self.all_golfers = (1 << (self.golfers + 1)) - 2
+        self.features = set(features)
+        self.deadline = deadline
+        self.stop = stop
+        self.pairs = PairTracker(self.golfers)
+        self.schedule = [[0] * groups for _ in range(weeks)]  # member mask of every group
+        self.stats = SearchStats(weeks * self.golfers)
+        self.best_weeks = 0
+
+    def fix_first_week(self):
+        for group in range(self.groups):
+            members = 0
+            for golfer in range(group * self.group_size + 1, (group + 1) * self.group_size + 1):
+                self.pairs.join(golfer, members)
+                members |= golfer_bit(golfer)
+            self.schedule[0][group] = members
+        self.best_weeks = 1
+
+    def week_possible(self, week):
+        # Every golfer still needs group_size - 1 new partners in each remaining week
+        needed = (self.group_size - 1) * (self.weeks - week)
+        for golfer in range(1, self.golfers + 1):
+            if self.golfers - 1 - self.pairs.partners[golfer].bit_count() < needed:
+                return False
+        return True
+
+    def groups_possible(self, free):
+        # Every unplaced golfer must still have group_size - 1 unplaced golfers it has not met
+        for golfer in golfers_in(free):
+            if (free & ~self.pairs.partners[golfer]).bit_count() < self.group_size:
+                return False
+        return True
+
+    def candidates(self, week, group, slot, free, members, last):
+        if slot == 0:
+            if "fix_column" in self.features and week > 0 and group < self.group_size:
+                return free & golfer_bit(group + 1)
+            if "order_groups" in self.features:
+                return free & -free
+            return free
+
+        blocked = 0
+        for golfer in golfers_in(members):
+            blocked |= self.pairs.partners[golfer]
+        options = free & ~blocked
+        if "ascending" in self.features:
+            options &= ~((2 << last) - 1)
+        if slot == 1 and group == 0 and week > 1 and "fix_column" in self.features:
+            previous = golfers_in(self.schedule[week - 1][0])[1]
+            options &= ~((2 << previous) - 1)
+        return options
+
+    def order(self, options, free):
+        golfers = golfers_in(options)
+        if "value_order" in self.features:
+            golfers.sort(key=lambda golfer: (free & ~self.pairs.partners[golfer]).bit_count())
+        return golfers
+
+    def search(self, week, group, slot, free, members, last):
+        if slot == self.group_size:
+            self.schedule[week][group] = members
+            group += 1
+            if group == self.groups:
+                self.best_weeks = max(self.best_weeks, week + 1)
+                return self.start_week(week + 1)
+            if "value_order" in self.features and not self.groups_possible(free):
+                return False
+            slot, members, last = 0, 0, 0
+
+        self.stats.node((week * self.groups + group) * self.group_size + slot)
+        if self.stats.nodes % CHECK_EVERY == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise BudgetExceeded
+            if self.stop is not None and self.stop.is_set():
+                raise BudgetExceeded
+
+        options = self.candidates(week, group, slot, free, members, last)
+        if slot and "ascending" in self.features and options.bit_count() < self.group_size - slot:
+            return False
+
+        for golfer in self.order(options, free):
+            bit = golfer_bit(golfer)
+            self.pairs.join(golfer, members)
+            if self.search(week, group, slot + 1, free & ~bit, members | bit, golfer):
+                return True
+            self.pairs.leave(golfer, members)
+            self.stats.backtrack()
+
+        self.schedule[week][group] = 0
+        return False
+
+    def start_week(self, week):
+        if week == self.weeks:
+            return True
+        if "value_order" in self.features and not self.week_possible(week):
+            return False
+        return self.search(week, 0, 0, self.all_golfers, 0, 0)
+
+    def solve(self):
+        if "fix_week" in self.features:
+            self.fix_first_week()
+            return self.start_week(1)
+        return self.start_week(0)
+
+    def to_rows(self):
+        return [[golfers_in(members) for members in week] for week in self.schedule]
+
+
+def schedule_is_valid(rows, golfers):
+    pairs = PairTracker(golfers)
+    for week in rows:
+        seen = 0
+        for group in week:
+            members = 0
+            for golfer in group:
+                if seen & golfer_bit(golfer) or not pairs.can_join(golfer, members):
+                    return False
+                pairs.join(golfer, members)
+                members |= golfer_bit(golfer)
+                seen |= golfer_bit(golfer)
+        if seen != (1 << (golfers + 1)) - 2:
+            return False
+    return True
+
+
+def print_solution(rows):
+    for w, week in enumerate(rows):
+        print(f"Week {w + 1}:")
+        for g, group in enumerate(week):
+            print(f"  Group {g + 1}: {' '.join(map(str, group))}")
+
+
+def run_configuration(groups, group_size, weeks, features, budget):
+    start = time.perf_counter()
+    solver = SymmetrySolver(groups, group_size, weeks, features, start + budget)
+    try:
+        status = "solved" if solver.solve() else "no solution"
+    except BudgetExceeded:
+        status = "timeout"
+    return solver, status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Social Golfer search with symmetry breaking")
+    parser.add_argument("-g", "--groups", type=int, default=8)
+    parser.add_argument("-s", "--size", type=int, default=4, help="golfers per group")
+    parser.add_argument("-w", "--weeks", type=int, nargs="+", default=[9, 10])
+    parser.add_argument("-b", "--budget", type=float, default=60.0, help="seconds per configuration")
+    parser.add_argument("-c", "--config", choices=[name for name, _ in CONFIGURATIONS], action="append",
+                        help="configurations to run (default: all)")
+    parser.add_argument("--show", action="store_true", help="print the first schedule found")
+    args = parser.parse_args()
+
+    configurations = [(name, features) for name, features in CONFIGURATIONS
+                      if args.config is None or name in args.config]
+    shown = False
+
+    print(f"{'instance':<10} {'config':<13} {'status':<12} {'weeks':>5} {'nodes':>12} {'seconds':>8} {'nodes/sec':>10}")
+    for weeks in args.weeks:
+        instance = f"{args.groups}-{args.size}-{weeks}"
+        for name, features in configurations:
+            solver, status, elapsed = run_configuration(args.groups, args.size, weeks, features, args.budget)
+            rows = solver.to_rows()
+            if status == "solved" and not schedule_is_valid(rows, solver.golfers):
+                status = "invalid"
+            rate = solver.stats.rate(elapsed)
+            print(f"{instance:<10} {name:<13} {status:<12} {solver.best_weeks:>5} {solver.stats.nodes:>12,} "
+                  f"{elapsed:>8.2f} {rate:>10,.0f}", flush=True)
+            if args.show and status == "solved" and not shown:
+                print(f"\nSolution for {instance} ({name}):")
+                print_solution(rows)
+                print()
+                shown = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import re
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("SocialGolfer_Validate.py needs NumPy: pip install numpy")
+
+WEEK_LINE = re.compile(r"week\s+\d+\s*:?$", re.IGNORECASE)
+GROUP_LINE = re.compile(r"group\s+\d+\s*:", re.IGNORECASE)
+
+
+def read_schedule(stream):
+    # Accepts the print_solution format ("Week 1:" / "  Group 1: 1 2 3 4") or plain
+    # rows of golfer numbers, one group per line, with weeks separated by blank
+    # lines; '#' starts a comment. Other lines, such as the solvers' "Solution found:"
+    # and summary lines, are skipped. Returns (weeks, skipped lines), each week a
+    # list of groups; raises ValueError for a Group line that does not parse.
+    weeks, week = [], []
+    skipped = 0
+    for number, line in enumerate(stream, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line or WEEK_LINE.match(line):
+            if week:
+                weeks.append(week)
+                week = []
+            continue
+        group = GROUP_LINE.match(line)
+        if group:
+            line = line[group.end():]
+        try:
+            week.append([int(golfer) for golfer in line.replace(",", " ").split()])
+        except ValueError:
+            if group:
+                raise ValueError(f"line {number}: group is not a list of golfer numbers")
+            skipped += 1
+    if week:
+        weeks.append(week)
+    return weeks, skipped
+
+
+def incidence(weeks, golfers):
+    # One row per (week, group) with a column per golfer; entries count how many
+    # times the golfer is listed in that group
+    index = {golfer: i for i, golfer in enumerate(golfers)}
+    rows = [(w, g) for w, week in enumerate(weeks) for g in range(len(week))]
+    entries = [(row, index[golfer]) for row, group in enumerate(group for week in weeks for group in week)
+               for golfer in group]
+    matrix = np.zeros((len(rows), len(golfers)), dtype=np.int32)
+    if entries:
+        row_index, golfer_index = np.array(entries).T
+        np.add.at(matrix, (row_index, golfer_index), 1)
+    return matrix, rows
+
+
+def find_violations(weeks):
+    if not weeks:
+        return ["schedule is empty"]
+
+    golfers = sorted({golfer for week in weeks for group in week for golfer in group})
+    matrix, rows = incidence(weeks, golfers)
+    present = np.minimum(matrix, 1)
+    violations = []
+
+    sizes = matrix.sum(axis=1)
+    expected = np.bincount(sizes).argmax()
+    for (w, g), size in zip(rows, sizes):
+        if size != expected:
+            violations.append(f"Week {w + 1}, Group {g + 1} has {size} golfers instead of {expected}")
+
+    for r, i in np.argwhere(matrix > 1):
+        w, g = rows[r]
+        violations.append(f"Week {w + 1}, Group {g + 1} lists golfer {golfers[i]} {matrix[r, i]} times")
+
+    # Appearances of every golfer in every week: rows of the same week summed together
+    week_of_row = np.array([w for w, _ in rows])
+    per_week = np.zeros((len(weeks), len(golfers)), dtype=np.int32)
+    np.add.at(per_week, week_of_row, present)
+    for w, i in np.argwhere(per_week != 1):
+        if per_week[w, i] == 0:
+            violations.append(f"Week {w + 1}: golfer {golfers[i]} does not play")
+        else:
+            violations.append(f"Week {w + 1}: golfer {golfers[i]} is in {per_week[w, i]} groups")
+
+    # Pair co-occurrence for all weeks at once: (groups x golfers)^T (groups x golfers)
+    together = present.T @ present
+    for i, j in np.argwhere(np.triu(together, 1) > 1):
+        met = present[:, i] & present[:, j]
+        where = ", ".join(f"week {rows[r][0] + 1}" for r in np.flatnonzero(met))
+        violations.append(f"Pair {golfers[i]}-{golfers[j]} played together {together[i, j]} times ({where})")
+
+    return violations
+
+
+def schedule_files(paths):
+    # Yields (path, listed): listed is False for files found in a directory
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full) and not name.startswith("."):
+                    yield full, False
+        else:
+            yield path, True
+
+
+def validate_paths(paths, quiet=False):
+    # Returns the number of invalid or unreadable schedules
+    checked = invalid = errors = 0
+    for path, listed in schedule_files(paths):
+        try:
+            with open(path) as stream:
+                weeks, skipped = read_schedule(stream)
+        except (OSError, ValueError) as error:  # ValueError includes UnicodeDecodeError
+            if not listed and not isinstance(error, OSError):
+                print(f"{path}: skipped, not a schedule ({error})")
+                continue
+            print(f"{path}: error: {error}")
+            errors += 1
+            continue
+        if not weeks:
+            if listed:
+                print(f"{path}: error: no schedule found")
+                errors += 1
+            else:
+                print(f"{path}: skipped, no schedule found")
+            continue
+
+        violations = find_violations(weeks)
+        checked += 1
+        note = f", {skipped} other lines skipped" if skipped else ""
+        if not violations:
+            print(f"{path}: valid ({len(weeks)} weeks{note})")
+            continue
+        invalid += 1
+        print(f"{path}: {len(violations)} violations")
+        if not quiet:
+            for violation in violations:
+                print(f"  {violation}")
+    print(f"{checked} schedules checked, {invalid} invalid, {errors} unreadable", file=sys.stderr)
+    return invalid + errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate Social Golfer schedules with NumPy pair counting")
+    parser.add_argument("paths", nargs="+", help="schedule files or directories of schedule files")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the number of violations per file")
+    args = parser.parse_args()
+    sys.exit(1 if validate_paths(args.paths, args.quiet) else 0)
+
+
+if __name__ == "__main__":
+    main()
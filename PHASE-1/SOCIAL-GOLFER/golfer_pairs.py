@@ -0,0 +1,53 @@
+# Compact pair tracking shared by the Social Golfer searches.
+# Golfers are numbered from 1 and golfer g is bit g of a mask.
+
+
+def golfer_bit(golfer):
+    return 1 << golfer
+
+
+def group_mask(group, slot):
+    # Mask of the golfers placed in the first slot positions of a group (0 = empty slot)
+    mask = 0
+    for s in range(slot):
+        if group[s]:
+            mask |= 1 << group[s]
+    return mask
+
+
+def golfers_in(mask):
+    golfers = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        golfers.append(bit.bit_length() - 1)
+    return golfers
+
+
+class PairTracker:
+    # partners[g] has bit h set once golfers g and h have been in a group together,
+    # so checking a golfer against a whole group is a single AND
+    def __init__(self, golfers):
+        self.partners = [0] * (golfers + 1)
+
+    def can_join(self, golfer, mask):
+        return not self.partners[golfer] & mask
+
+    def join(self, golfer, mask):
+        self.partners[golfer] |= mask
+        bit = 1 << golfer
+        for other in golfers_in(mask):
+            self.partners[other] |= bit
+
+    def leave(self, golfer, mask):
+        self.partners[golfer] &= ~mask
+        bit = ~(1 << golfer)
+        for other in golfers_in(mask):
+            self.partners[other] &= bit
+
+    def pairs(self):
+        return {(golfer, other) for golfer, mask in enumerate(self.partners)
+                for other in golfers_in(mask) if golfer < other}
+
+    def __repr__(self):
+        return repr(self.pairs())
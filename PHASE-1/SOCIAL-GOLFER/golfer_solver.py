@@ -0,0 +1,142 @@
+# Class-based version of the Social Golfer searches: parameters and search state
+# live on the instance, so several instances can run in one process or in a pool.
+import random
+import time
+
+from golfer_pairs import PairTracker, golfer_bit, group_mask
+from golfer_stats import CHECK_EVERY, SearchStats
+
+
+class SearchAborted(Exception):
+    pass
+
+
+class GolferSolver:
+    # The same slot-by-slot search as SocialGolfer_Backtracking.py / _DFS.py.
+    # With max_depth set the search succeeds once that many weeks are complete, as
+    # dls() in _DLS.py, and solve_deepening() iterates it over the weeks. With rng
+    # set the golfers are tried in a random order at every slot after the first
+    # week (any first week is equivalent up to renaming golfers).
+    def __init__(self, weeks, groups, group_size, max_depth=None, rng=None,
+                 node_limit=None, deadline=None, stop=None):
+        self.weeks = weeks
+        self.groups = groups
+        self.group_size = group_size
+        self.golfers = groups * group_size
+        self.max_depth = weeks if max_depth is None else min(max_depth, weeks)
+        self.rng = rng
+        self.node_limit = node_limit
+        self.deadline = deadline
+        self.stop = stop
+        self.schedule = [[[0] * group_size for _ in range(groups)] for _ in range(weeks)]
+        self.pairs = PairTracker(self.golfers)
+        self.week_members = [0] * weeks
+        self.stats = SearchStats(weeks * self.golfers)
+        self.best_weeks = 0
+
+    def check_limits(self):
+        if self.node_limit is not None and self.stats.nodes >= self.node_limit:
+            raise SearchAborted("node limit")
+        if self.stats.nodes % CHECK_EVERY == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchAborted("timeout")
+            if self.stop is not None and self.stop.is_set():
+                raise SearchAborted("stopped")
+
+    def is_valid(self, golfer, week, group, slot):
+        if self.week_members[week] & golfer_bit(golfer):
+            return False
+
+        mask = group_mask(self.schedule[week][group], slot)
+        if not self.pairs.can_join(golfer, mask):
+            return False
+
+        self.pairs.join(golfer, mask)
+        self.week_members[week] |= golfer_bit(golfer)
+        return True
+
+    def remove_played_pairs(self, golfer, week, group):
+        self.pairs.leave(golfer, group_mask(self.schedule[week][group], self.group_size))
+        self.week_members[week] &= ~golfer_bit(golfer)
+
+    def search(self, week, group, slot, depth):
+        # depth counts complete weeks
+        if depth == self.max_depth:
+            return True
+
+        if slot == self.group_size:
+            return self.search(week, group + 1, 0, depth)
+
+        if group == self.groups:
+            self.best_weeks = max(self.best_weeks, week + 1)
+            return self.search(week + 1, 0, 0, depth + 1)
+
+        order = range(1, self.golfers + 1)
+        if self.rng is not None and week > 0:
+            order = list(order)
+            self.rng.shuffle(order)
+
+        position = (week * self.groups + group) * self.group_size + slot
+        for golfer in order:
+            self.stats.node(position)
+            self.check_limits()
+
+            if self.is_valid(golfer, week, group, slot):
+                self.schedule[week][group][slot] = golfer
+
+                if self.search(week, group, slot + 1, depth):
+                    return True
+
+                self.stats.backtrack()
+                self.schedule[week][group][slot] = 0
+                self.remove_played_pairs(golfer, week, group)
+
+        return False
+
+    def solve(self):
+        return self.search(0, 0, 0, 0)
+
+    def reset(self):
+        self.schedule = [[[0] * self.group_size for _ in range(self.groups)] for _ in range(self.weeks)]
+        self.pairs = PairTracker(self.golfers)
+        self.week_members = [0] * self.weeks
+
+    def solve_deepening(self):
+        # Iterative deepening over weeks, as in _DLS.py: every limit first extends
+        # the prefix completed at the previous limit by one week, and only searches
+        # from scratch when that prefix has no extension
+        for limit in range(1, self.weeks + 1):
+            self.max_depth = limit
+            if limit > 1 and self.search(limit - 1, 0, 0, limit - 1):
+                continue
+            self.reset()
+            if not self.search(0, 0, 0, 0):
+                return False
+        return True
+
+    def to_rows(self):
+        return [[list(group) for group in week] for week in self.schedule]
+
+
+def solve_with_restarts(weeks, groups, group_size, seed=None, first_limit=10000, growth=1.5,
+                        deadline=None, stop=None):
+    # Randomized restarts: every run shuffles the golfer order and gets a node
+    # limit growth times larger than the previous one. A run that finishes
+    # inside its limit is a complete search, so False there means no solution.
+    # Returns (status, solver of the last run, total nodes, restarts, best weeks)
+    rng = random.Random(seed)
+    limit = first_limit
+    total = restarts = best_weeks = 0
+    while True:
+        solver = GolferSolver(weeks, groups, group_size, rng=rng, node_limit=limit,
+                              deadline=deadline, stop=stop)
+        try:
+            status = "solved" if solver.solve() else "no solution"
+        except SearchAborted as reason:
+            status = str(reason)
+        total += solver.stats.nodes
+        best_weeks = max(best_weeks, solver.best_weeks)
+        if status != "node limit":
+            return status, solver, total, restarts, best_weeks
+        restarts += 1
+        limit = int(limit * growth)
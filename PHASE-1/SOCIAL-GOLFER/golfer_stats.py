@@ -0,0 +1,76 @@
+# Counters for the Social Golfer searches.
+# Nothing is printed per node: progress lines are rate limited and the
+# per-node trace only goes to a file when one is requested.
+import sys
+import time
+
+CHECK_EVERY = 4096  # nodes between clock reads when progress reporting is on
+
+
+class SearchStats:
+    def __init__(self, max_depth, progress_every=0, trace_path=None):
+        self.nodes = 0
+        self.backtracks = 0
+        self.deepest = 0
+        self.depth_counts = [0] * (max_depth + 1)
+        self.progress_every = progress_every
+        self.next_check = CHECK_EVERY if progress_every else -1
+        self.trace_file = open(trace_path, "w") if trace_path else None
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def node(self, depth):
+        self.nodes += 1
+        self.depth_counts[depth] += 1
+        if depth > self.deepest:
+            self.deepest = depth
+        if self.nodes == self.next_check:
+            self.next_check += CHECK_EVERY
+            now = time.perf_counter()
+            if now - self.last_report >= self.progress_every:
+                self.last_report = now
+                self.progress(now)
+
+    def backtrack(self):
+        self.backtracks += 1
+
+    def trace(self, message):
+        self.trace_file.write(message + "\n")
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def rate(self, elapsed=None):
+        if elapsed is None:
+            elapsed = self.elapsed()
+        return self.nodes / elapsed if elapsed > 0 else float("inf")
+
+    def progress(self, now):
+        elapsed = now - self.start
+        print(f"[{elapsed:8.1f}s] {self.nodes:,} nodes, {self.backtracks:,} backtracks, "
+              f"deepest {self.deepest}, {self.rate(elapsed):,.0f} nodes/sec", file=sys.stderr)
+
+    def close(self):
+        if self.trace_file is not None:
+            self.trace_file.close()
+            self.trace_file = None
+
+    def histogram(self, bucket=1):
+        # (first depth, last depth, nodes) for every non-empty bucket of depths
+        rows = []
+        for first in range(0, len(self.depth_counts), bucket):
+            count = sum(self.depth_counts[first:first + bucket])
+            if count:
+                last = min(first + bucket, len(self.depth_counts)) - 1
+                rows.append((first, last, count))
+        return rows
+
+    def report(self, label, bucket=1):
+        self.close()
+        elapsed = self.elapsed()
+        print(f"{label}: {self.nodes:,} nodes, {self.backtracks:,} backtracks, deepest {self.deepest} "
+              f"in {elapsed:.3f}s ({self.rate(elapsed):,.0f} nodes/sec)")
+        print("Depth histogram:")
+        for first, last, count in self.histogram(bucket):
+            depths = f"{first}" if first == last else f"{first}-{last}"
+            print(f"  {depths:>9}: {count:,}")
@@ -1,68 +1,528 @@
+import heapq
+import math
+import os
+import sys
+import time
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "COMMON"))
+from exact_cover import ExactCover
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"  # text form of digits for boards up to 25x25
+
+
+def all_digits(size):
+    # Candidate mask with bits 1..size set
+    return ((1 << size) - 1) << 1
+
+
+def box_size_of(board):
+    size = len(board)
+    box_size = math.isqrt(size)
+    if box_size * box_size != size:
+        raise ValueError(f"board size {size} is not a perfect square")
+    return box_size
+
+
+@lru_cache(maxsize=None)
+def board_tables(box_size):
+    # Flat-index tables shared by every board of this size:
+    # units (rows, columns, boxes), peers of each cell and the box of each cell
+    size = box_size * box_size
+    rows = [[row * size + col for col in range(size)] for row in range(size)]
+    cols = [[row * size + col for row in range(size)] for col in range(size)]
+    boxes = [[(box_row + i) * size + box_col + j for i in range(box_size) for j in range(box_size)]
+             for box_row in range(0, size, box_size) for box_col in range(0, size, box_size)]
+    units = rows + cols + boxes
+
+    box_of = [0] * (size * size)
+    for box, unit in enumerate(boxes):
+        for cell in unit:
+            box_of[cell] = box
+
+    peers = []
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        cell_peers = set(rows[row]) | set(cols[col]) | set(boxes[box_of[cell]])
+        cell_peers.discard(cell)
+        peers.append(tuple(sorted(cell_peers)))
+
+    return units, peers, box_of
+
+
+class SudokuBoard:
+    # N^2 x N^2 board stored as a flat bytearray (0 for an empty cell).
+    # board[row][col] reads and writes through a memoryview of the row, so the
+    # row/column based helpers work on it the same way as on a list of lists.
+    def __init__(self, box_size=3, cells=None):
+        self.box_size = box_size
+        self.size = box_size * box_size
+        if cells is None:
+            self.cells = bytearray(self.size * self.size)
+        else:
+            self.cells = bytearray(cells)
+            if len(self.cells) != self.size * self.size:
+                raise ValueError(f"expected {self.size * self.size} cells, got {len(self.cells)}")
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(box_size_of(rows), [num for row in rows for num in row])
+
+    @classmethod
+    def from_string(cls, text):
+        box_size = math.isqrt(math.isqrt(len(text)))
+        if box_size ** 4 != len(text):
+            raise ValueError(f"{len(text)} characters is not a valid board length")
+        size = box_size * box_size
+        cells = [0 if ch in ".0" else SYMBOLS.index(ch.upper()) + 1 for ch in text]
+        if max(cells) > size:
+            raise ValueError(f"digit out of range for a {size}x{size} board")
+        return cls(box_size, cells)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        return memoryview(self.cells)[row * self.size:(row + 1) * self.size]
+
+    def copy(self):
+        return SudokuBoard(self.box_size, self.cells)
+
+    def to_rows(self):
+        return [list(self[row]) for row in range(self.size)]
+
+    def to_string(self):
+        return "".join(SYMBOLS[num - 1] if num else "." for num in self.cells)
+
+
+def board_cells(board):
+    if isinstance(board, SudokuBoard):
+        return list(board.cells)
+    return [num for row in board for num in row]
+
+
+def store_cells(board, cells):
+    if isinstance(board, SudokuBoard):
+        board.cells[:] = bytes(cells)
+        return
+
+    size = len(board)
+    for cell, num in enumerate(cells):
+        board[cell // size][cell % size] = num
+
+
+def copy_board(board):
+    if isinstance(board, SudokuBoard):
+        return board.copy()
+    return [row[:] for row in board]
 
 
 def print_board(board):
-    for i in range(9):
-        if i % 3 == 0 and i != 0:
-            print("- - - - - - - - - - - -")
-        for j in range(9):
-            if j % 3 == 0 and j != 0:
+    size = len(board)
+    box_size = box_size_of(board)
+    width = len(str(size))
+    for i in range(size):
+        if i % box_size == 0 and i != 0:
+            print(" ".join(["-"] * ((size * (width + 1) + (box_size - 1) * 3) // 2)))
+        for j in range(size):
+            if j % box_size == 0 and j != 0:
                 print(" | ", end="")
-            if j == 8:
-                print(board[i][j])
+            if j == size - 1:
+                print(str(board[i][j]).rjust(width))
             else:
-                print(str(board[i][j]) + " ", end="")
+                print(str(board[i][j]).rjust(width) + " ", end="")
 
 
 def find_empty_location(board):
-    for i in range(9):
-        for j in range(9):
+    size = len(board)
+    for i in range(size):
+        for j in range(size):
             if board[i][j] == 0:
                 return (i, j)
     return None
 
 
 def is_valid(board, row, col, num):
+    size = len(board)
+    box_size = box_size_of(board)
 
-    for i in range(9):
+    for i in range(size):
         if board[row][i] == num:
             return False
 
-    for i in range(9):
+    for i in range(size):
         if board[i][col] == num:
             return False
 
-    box_start_row = row - row % 3
-    box_start_col = col - col % 3
-    for i in range(3):
-        for j in range(3):
+    box_start_row = row - row % box_size
+    box_start_col = col - col % box_size
+    for i in range(box_size):
+        for j in range(box_size):
             if board[box_start_row + i][box_start_col + j] == num:
                 return False
     return True
 
 
+def init_candidate_masks(cells, box_size):
+    # Bit n of a mask is set when digit n is already used in that row/column/box
+    size = box_size * box_size
+    box_of = board_tables(box_size)[2]
+    row_masks = [0] * size
+    col_masks = [0] * size
+    box_masks = [0] * size
+    empty_cells = []
+
+    for cell, num in enumerate(cells):
+        row, col = divmod(cell, size)
+        box = box_of[cell]
+        if num == 0:
+            empty_cells.append((cell, row, col, box))
+            continue
+
+        bit = 1 << num
+        if (row_masks[row] | col_masks[col] | box_masks[box]) & bit:
+            return None
+        row_masks[row] |= bit
+        col_masks[col] |= bit
+        box_masks[box] |= bit
+
+    return row_masks, col_masks, box_masks, empty_cells
+
+
 def solve_sudoku_backtracking(board):
-    empty_loc = find_empty_location(board)
-    if not empty_loc:
+    box_size = box_size_of(board)
+    cells = board_cells(board)
+    masks = init_candidate_masks(cells, box_size)
+    if masks is None:
+        return False
+
+    row_masks, col_masks, box_masks, empty_cells = masks
+    digits = all_digits(box_size * box_size)
+    if not backtrack_masks(cells, empty_cells, 0, digits, row_masks, col_masks, box_masks):
+        return False
+
+    store_cells(board, cells)
+    return True
+
+
+def backtrack_masks(cells, empty_cells, index, digits, row_masks, col_masks, box_masks):
+    if index == len(empty_cells):
         return True
 
-    row, col = empty_loc
+    cell, row, col, box = empty_cells[index]
+    free = digits & ~(row_masks[row] | col_masks[col] | box_masks[box])
 
-    for num in range(1, 10):
-        if is_valid(board, row, col, num):
-            board[row][col] = num
+    while free:
+        bit = free & -free
+        free ^= bit
 
-            if solve_sudoku_backtracking(board):
-                return True
+        cells[cell] = bit.bit_length() - 1
+        row_masks[row] |= bit
+        col_masks[col] |= bit
+        box_masks[box] |= bit
+
+        if backtrack_masks(cells, empty_cells, index + 1, digits, row_masks, col_masks, box_masks):
+            return True
 
-            board[row][col] = 0
+        row_masks[row] ^= bit
+        col_masks[col] ^= bit
+        box_masks[box] ^= bit
 
+    cells[cell] = 0
     return False
 
 
+class PropagationSolver:
+    # Naked singles, hidden singles and MRV branching over per-cell candidate masks.
+    # Every change is recorded on a trail so a failed branch is undone in O(changes).
+    def __init__(self, board):
+        self.board = board
+        self.box_size = box_size_of(board)
+        self.size = self.box_size * self.box_size
+        self.units, self.peers, _ = board_tables(self.box_size)
+        self.all_digits = all_digits(self.size)
+        self.cells = [0] * (self.size * self.size)
+        self.candidates = [self.all_digits] * (self.size * self.size)
+        self.trail = []
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0  # deepest branching level reached, 0 if propagation alone solved it
+        self.consistent = all(
+            self.assign(cell, num) for cell, num in enumerate(board_cells(board)) if num
+        )
+
+    def assign(self, cell, num):
+        pending = [(cell, num)]
+
+        while pending:
+            cell, num = pending.pop()
+            if self.cells[cell]:
+                if self.cells[cell] != num:
+                    return False
+                continue
+
+            bit = 1 << num
+            if not self.candidates[cell] & bit:
+                return False
+
+            self.trail.append((cell, self.candidates[cell], 0))
+            self.cells[cell] = num
+            self.candidates[cell] = bit
+
+            for peer in self.peers[cell]:
+                mask = self.candidates[peer]
+                if not mask & bit:
+                    continue
+                if self.cells[peer]:
+                    return False
+
+                mask ^= bit
+                if not mask:
+                    return False
+                self.trail.append((peer, self.candidates[peer], 0))
+                self.candidates[peer] = mask
+                if not mask & (mask - 1):
+                    pending.append((peer, mask.bit_length() - 1))
+
+        return True
+
+    def hidden_singles(self):
+        # Returns None on contradiction, otherwise the number of digits placed
+        placed = 0
+
+        for unit in self.units:
+            seen_once = seen_twice = solved = 0
+            for cell in unit:
+                if self.cells[cell]:
+                    solved |= self.candidates[cell]
+                else:
+                    mask = self.candidates[cell]
+                    seen_twice |= seen_once & mask
+                    seen_once |= mask
+
+            unsolved = self.all_digits & ~solved
+            if unsolved & ~seen_once:
+                return None
+
+            singles = seen_once & ~seen_twice & unsolved
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for cell in unit:
+                    if not self.cells[cell] and self.candidates[cell] & bit:
+                        if not self.assign(cell, bit.bit_length() - 1):
+                            return None
+                        placed += 1
+                        break
+
+        return placed
+
+    def propagate(self):
+        while True:
+            placed = self.hidden_singles()
+            if placed is None:
+                return False
+            if placed == 0:
+                return True
+
+    def select_cell(self):
+        best_cell = None
+        best_count = self.size + 1
+
+        for cell in range(len(self.cells)):
+            if self.cells[cell]:
+                continue
+            count = self.candidates[cell].bit_count()
+            if count < best_count:
+                best_cell = cell
+                best_count = count
+                if count == 2:
+                    break
+
+        return best_cell
+
+    def undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            cell, mask, num = trail.pop()
+            self.candidates[cell] = mask
+            self.cells[cell] = num
+
+    def search(self, depth=0):
+        self.nodes += 1
+        self.max_depth = max(self.max_depth, depth)
+        if not self.propagate():
+            return False
+
+        cell = self.select_cell()
+        if cell is None:
+            return True
+
+        free = self.candidates[cell]
+        while free:
+            bit = free & -free
+            free ^= bit
+
+            mark = len(self.trail)
+            if self.assign(cell, bit.bit_length() - 1) and self.search(depth + 1):
+                return True
+
+            self.undo(mark)
+            self.backtracks += 1
+
+        return False
+
+    def solve(self):
+        if not self.consistent or not self.search():
+            return False
+
+        store_cells(self.board, self.cells)
+        return True
+
+    def count_search(self, limit, found):
+        self.nodes += 1
+        if not self.propagate():
+            return found
+
+        cell = self.select_cell()
+        if cell is None:
+            return found + 1
+
+        free = self.candidates[cell]
+        while free and found < limit:
+            bit = free & -free
+            free ^= bit
+
+            mark = len(self.trail)
+            if self.assign(cell, bit.bit_length() - 1):
+                found = self.count_search(limit, found)
+            self.undo(mark)
+
+        return found
+
+    def count(self, limit):
+        # Counts solutions up to limit; the solver state is left as it was
+        if not self.consistent:
+            return 0
+        mark = len(self.trail)
+        found = self.count_search(limit, 0)
+        self.undo(mark)
+        return found
+
+    def branch_boards(self):
+        # Splits the search on the most constrained cell after propagation.
+        # Returns None if the puzzle is contradictory, [] if propagation solved it.
+        if not self.consistent or not self.propagate():
+            return None
+
+        cell = self.select_cell()
+        if cell is None:
+            return []
+
+        branches = []
+        free = self.candidates[cell]
+        while free:
+            bit = free & -free
+            free ^= bit
+            board = copy_board(self.board)
+            store_cells(board, self.cells)
+            board[cell // self.size][cell % self.size] = bit.bit_length() - 1
+            branches.append(board)
+        return branches
+
+
+def solve_sudoku_propagation(board):
+    return PropagationSolver(board).solve()
+
+
+def count_solutions(board, limit=2, workers=1):
+    # count_solutions(board, 2) == 1 proves the puzzle has a unique solution.
+    # With workers > 1 the top-level branches of the first MRV cell are counted
+    # in separate processes; the result is capped at limit either way.
+    if workers <= 1:
+        return PropagationSolver(board).count(limit)
+
+    branches = PropagationSolver(board).branch_boards()
+    if branches is None:
+        return 0
+    if not branches:
+        return 1
+
+    found = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(count_solutions, branch, limit) for branch in branches]
+        for future in as_completed(futures):
+            found += future.result()
+            if found >= limit:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    return min(found, limit)
+
+
+def sudoku_exact_cover(board):
+    # Columns: size^2 cells, then digit-in-row, digit-in-column and digit-in-box (size^2 each)
+    box_size = box_size_of(board)
+    size = box_size * box_size
+    area = size * size
+    box_of = board_tables(box_size)[2]
+    matrix = ExactCover(4 * area)
+    for row in range(size):
+        for col in range(size):
+            given = board[row][col]
+            box = box_of[row * size + col]
+            for num in ([given] if given else range(1, size + 1)):
+                matrix.add_row([row * size + col, area + row * size + num - 1,
+                                2 * area + col * size + num - 1, 3 * area + box * size + num - 1],
+                               (row, col, num))
+    return matrix
+
+
+def solve_sudoku_dlx(board):
+    solution = sudoku_exact_cover(board).solve()
+    if solution is None:
+        return False
+
+    for row, col, num in solution:
+        board[row][col] = num
+    return True
+
+
+# Engines usable by the batch tools: each takes a list-of-lists or SudokuBoard,
+# fills it in place and returns True when a solution was found
+SOLVERS = {
+    "backtracking": solve_sudoku_backtracking,
+    "propagation": solve_sudoku_propagation,
+    "dlx": solve_sudoku_dlx,
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report_search_stats(label, states, elapsed):
+    rate = states / elapsed if elapsed > 0 else float("inf")
+    rss = peak_rss_mb()
+    rss_text = f"{rss:.1f} MB" if rss is not None else "n/a"
+    print(f"{label}: {states} states in {elapsed:.3f}s ({rate:,.0f} states/sec), peak RSS {rss_text}")
+
+
 def solve_sudoku_bfs(board):
     q = deque([board])
     step = 0
+    start = time.perf_counter()
 
     while q:
         current_board = q.popleft()
@@ -77,19 +537,98 @@ def solve_sudoku_bfs(board):
         if not empty_loc:
             print(f"Solution found with BFS after {step} steps:")
             print_board(current_board)
+            report_search_stats("BFS", step, time.perf_counter() - start)
             return True
 
         row, col = empty_loc
 
-        for num in range(1, 10):
+        for num in range(1, len(current_board) + 1):
             if is_valid(current_board, row, col, num):
-                new_board = [row[:] for row in current_board]
+                new_board = copy_board(current_board)
                 new_board[row][col] = num
                 q.append(new_board)
 
+    report_search_stats("BFS", step, time.perf_counter() - start)
     return False
 
 
+def most_constrained_cell(state, peers, digits):
+    # Returns (cell, candidates) for the empty cell with the fewest candidates,
+    # (None, 0) for a full grid and (cell, 0) for a dead end
+    best_cell = None
+    best_free = 0
+    best_count = len(state)
+
+    for cell in range(len(state)):
+        if state[cell]:
+            continue
+
+        used = 0
+        for peer in peers[cell]:
+            used |= 1 << state[peer]
+        free = digits & ~used
+        count = free.bit_count()
+
+        if count < best_count:
+            best_cell, best_free, best_count = cell, free, count
+            if count <= 1:
+                break
+
+    return best_cell, best_free
+
+
+def solve_sudoku_bfs_compact(board, frontier_cap=None):
+    # Level-by-level BFS over one-byte-per-cell states. Every state in a level has the same
+    # number of filled cells, so a per-level set removes all duplicates.
+    # With frontier_cap set, each level is trimmed to the cap (beam search),
+    # preferring children of the most constrained parents.
+    start = time.perf_counter()
+    box_size = box_size_of(board)
+    peers = board_tables(box_size)[1]
+    digits = all_digits(box_size * box_size)
+    frontier = [bytes(board_cells(board))]
+    expanded = duplicates = trimmed = peak_frontier = 0
+    solution = None
+
+    while frontier and solution is None:
+        peak_frontier = max(peak_frontier, len(frontier))
+        next_level = {}
+
+        for state in frontier:
+            expanded += 1
+            cell, free = most_constrained_cell(state, peers, digits)
+            if cell is None:
+                solution = state
+                break
+
+            score = free.bit_count()
+            child = bytearray(state)
+            while free:
+                bit = free & -free
+                free ^= bit
+                child[cell] = bit.bit_length() - 1
+                key = bytes(child)
+                if key in next_level:
+                    duplicates += 1
+                else:
+                    next_level[key] = score
+
+        if frontier_cap is not None and len(next_level) > frontier_cap:
+            trimmed += len(next_level) - frontier_cap
+            frontier = heapq.nsmallest(frontier_cap, next_level, key=next_level.get)
+        else:
+            frontier = list(next_level)
+
+    label = "BFS (compact)" if frontier_cap is None else f"Beam search (cap {frontier_cap})"
+    report_search_stats(label, expanded, time.perf_counter() - start)
+    print(f"Peak frontier: {peak_frontier}, duplicates dropped: {duplicates}, trimmed by beam: {trimmed}")
+
+    if solution is None:
+        return False
+
+    store_cells(board, solution)
+    return True
+
 
 def generate_board(level):
     boards = {
@@ -154,8 +693,11 @@ def main():
     print("\nChoose the algorithm to solve Sudoku: ")
     print("1. Backtracking")
     print("2. BFS")
+    print("3. Constraint propagation (MRV)")
+    print("4. BFS with compact frontier / beam search")
+    print("5. Dancing Links (exact cover)")
 
-    algo_choice = input("Your choice (1/2): ")
+    algo_choice = input("Your choice (1/2/3/4/5): ")
     if algo_choice == '1':
         if solve_sudoku_backtracking(board):
             print("\nSolution found using Backtracking:")
@@ -165,6 +707,32 @@ def main():
     elif algo_choice == '2':
         if not solve_sudoku_bfs(board):
             print("Cannot be solved using BFS!")
+    elif algo_choice == '3':
+        solver = PropagationSolver(board)
+        if solver.solve():
+            print("\nSolution found using constraint propagation:")
+            print_board(board)
+        else:
+            print("Cannot be solved using constraint propagation!")
+        print(f"Nodes: {solver.nodes}, backtracks: {solver.backtracks}")
+    elif algo_choice == '4':
+        cap = input("Frontier cap for beam search (empty for plain BFS): ").strip()
+        if solve_sudoku_bfs_compact(board, int(cap) if cap else None):
+            print("\nSolution found using compact BFS:")
+            print_board(board)
+        else:
+            print("Cannot be solved using compact BFS!")
+    elif algo_choice == '5':
+        matrix = sudoku_exact_cover(board)
+        solution = matrix.solve()
+        if solution:
+            for row, col, num in solution:
+                board[row][col] = num
+            print("\nSolution found using Dancing Links:")
+            print_board(board)
+            print(f"Puzzle has {'a unique' if matrix.count(limit=2) == 1 else 'more than one'} solution")
+        else:
+            print("Cannot be solved using Dancing Links!")
     else:
         print("Invalid choice!")
 
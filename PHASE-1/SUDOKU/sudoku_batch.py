@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku import SOLVERS, SudokuBoard, count_solutions
+
+STATUSES = ("invalid", "unsolvable", "unique", "multiple")
+
+
+def parse_puzzle(line):
+    # 81, 256 or 625 characters; digits 1-9 then letters, '.' or '0' for blanks
+    return SudokuBoard.from_string(line)
+
+
+def format_board(board):
+    return board.to_string()
+
+
+def solve_chunk(engine, lines):
+    solver = SOLVERS[engine]
+    results = []
+
+    for line in lines:
+        try:
+            board = parse_puzzle(line)
+        except ValueError:
+            results.append("invalid")
+            continue
+
+        results.append(format_board(board) if solver(board) else "unsolvable")
+
+    return results
+
+
+def check_chunk(engine, lines):
+    # engine is unused: uniqueness checks always run on the propagation solver
+    results = []
+
+    for line in lines:
+        try:
+            board = parse_puzzle(line)
+        except ValueError:
+            results.append("invalid")
+            continue
+
+        results.append(("unsolvable", "unique", "multiple")[count_solutions(board, 2)])
+
+    return results
+
+
+def read_chunks(stream, chunk_size):
+    chunk = []
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def solve_batch(stream, output, engine="propagation", workers=None, chunk_size=256, check_unique=False):
+    # Chunks are submitted lazily and written back in input order, with at most a few
+    # chunks per worker in flight, so memory stays flat for arbitrarily long inputs
+    workers = workers or os.cpu_count() or 1
+    task = check_chunk if check_unique else solve_chunk
+    counts = {}
+    start = time.perf_counter()
+
+    def write(results):
+        for result in results:
+            status = result if result in STATUSES else "solved"
+            counts[status] = counts.get(status, 0) + 1
+            output.write(result + "\n")
+        output.flush()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in read_chunks(stream, chunk_size):
+            pending.append(pool.submit(task, engine, chunk))
+            while len(pending) >= workers * 4 or (pending and pending[0].done()):
+                write(pending.popleft().result())
+
+        while pending:
+            write(pending.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    mode = "uniqueness check" if check_unique else f"engine '{engine}'"
+    print(f"{total} puzzles ({summary}) in {elapsed:.2f}s with {mode}", file=sys.stderr)
+    print(f"Throughput: {rate:,.0f} puzzles/sec on {workers} workers "
+          f"({rate / workers:,.0f} puzzles/sec per core)", file=sys.stderr)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzles given one per line (81, 256 or 625 characters).")
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="solution file, '-' for stdout")
+    parser.add_argument("-e", "--engine", choices=sorted(SOLVERS), default="propagation")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=256, help="puzzles per task sent to a worker")
+    parser.add_argument("-u", "--check-unique", action="store_true",
+                        help="write unique/multiple/unsolvable per puzzle instead of a solution")
+    args = parser.parse_args()
+
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        solve_batch(stream, output, args.engine, args.workers, args.chunk_size, args.check_unique)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
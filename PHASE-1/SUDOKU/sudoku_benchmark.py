@@ -0,0 +1,85 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import random
+import time
+
+from sudoku import SOLVERS, SudokuBoard, solve_sudoku_bfs_compact
+
+
+def solve_sudoku_beam(board):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return solve_sudoku_bfs_compact(board, frontier_cap=1000)
+
+
+ENGINES = dict(SOLVERS, beam=solve_sudoku_beam)
+
+
+def random_full_board(box_size, rng):
+    # Shifted-pattern solution with rows, columns and digits shuffled within
+    # the moves that keep it valid
+    size = box_size * box_size
+    bands = rng.sample(range(box_size), box_size)
+    rows = [band * box_size + row for band in bands for row in rng.sample(range(box_size), box_size)]
+    stacks = rng.sample(range(box_size), box_size)
+    cols = [stack * box_size + col for stack in stacks for col in rng.sample(range(box_size), box_size)]
+    digits = rng.sample(range(1, size + 1), size)
+
+    cells = [digits[(box_size * (row % box_size) + row // box_size + col) % size]
+             for row in rows for col in cols]
+    return SudokuBoard(box_size, cells)
+
+
+def make_puzzle(box_size, blank_ratio, seed):
+    rng = random.Random(seed)
+    board = random_full_board(box_size, rng)
+    area = len(board.cells)
+    for cell in rng.sample(range(area), int(area * blank_ratio)):
+        board.cells[cell] = 0
+    return board
+
+
+def run_engine(engine, board, results):
+    start = time.perf_counter()
+    solved = ENGINES[engine](board)
+    results.put((solved, time.perf_counter() - start))
+
+
+def time_engine(engine, board, timeout):
+    # Each run gets its own process so a hopeless engine can be stopped at the timeout
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=run_engine, args=(engine, board.copy(), results))
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        worker.terminate()
+        worker.join()
+        return None
+    return results.get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every Sudoku engine on 9x9, 16x16 and 25x25 boards.")
+    parser.add_argument("-e", "--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("-b", "--box-sizes", nargs="+", type=int, default=[3, 4, 5])
+    parser.add_argument("-r", "--blank-ratio", type=float, default=0.5, help="fraction of cells cleared")
+    parser.add_argument("-t", "--timeout", type=float, default=30.0, help="seconds per engine run")
+    parser.add_argument("-s", "--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>7}  {'engine':<13} {'result':<10} {'seconds':>9}")
+    for box_size in args.box_sizes:
+        size = box_size * box_size
+        board = make_puzzle(box_size, args.blank_ratio, args.seed)
+        for engine in args.engines:
+            outcome = time_engine(engine, board, args.timeout)
+            if outcome is None:
+                result, seconds = "timeout", f">{args.timeout:g}"
+            else:
+                result, seconds = "solved" if outcome[0] else "unsolved", f"{outcome[1]:.4f}"
+            print(f"{size:>3}x{size:<3}  {engine:<13} {result:<10} {seconds:>9}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
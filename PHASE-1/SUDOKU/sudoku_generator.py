@@ -0,0 +1,132 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sudoku import PropagationSolver, SudokuBoard, board_tables, count_solutions
+
+# Upper bounds on (search nodes, backtracks) for each grade, checked in order
+GRADES = (
+    ("easy", 1, 0),
+    ("medium", 3, 0),
+    ("hard", 20, 10),
+    ("expert", None, None),
+)
+
+
+def random_solution(box_size, rng):
+    # Boxes on the diagonal never share a row or column, so filling them with
+    # independent shuffles is always consistent; propagation completes the rest
+    size = box_size * box_size
+    board = SudokuBoard(box_size)
+    units = board_tables(box_size)[0]
+    for box in range(0, size, box_size + 1):
+        for cell, num in zip(units[2 * size + box], rng.sample(range(1, size + 1), size)):
+            board.cells[cell] = num
+
+    PropagationSolver(board).solve()
+    return board
+
+
+def grade_puzzle(board):
+    solver = PropagationSolver(board.copy())
+    solver.solve()
+    for grade, max_nodes, max_backtracks in GRADES:
+        if max_nodes is None or (solver.nodes <= max_nodes and solver.backtracks <= max_backtracks):
+            return grade, solver.nodes, solver.backtracks, solver.max_depth
+
+
+def generate_puzzle(box_size, seed):
+    # Clears cells in random order, keeping each removal only while the
+    # puzzle still has exactly one solution
+    rng = random.Random(seed)
+    solution = random_solution(box_size, rng)
+    puzzle = solution.copy()
+
+    cells = list(range(len(puzzle.cells)))
+    rng.shuffle(cells)
+    for cell in cells:
+        num = puzzle.cells[cell]
+        puzzle.cells[cell] = 0
+        if count_solutions(puzzle, 2) != 1:
+            puzzle.cells[cell] = num
+
+    grade, nodes, backtracks, depth = grade_puzzle(puzzle)
+    givens = sum(1 for num in puzzle.cells if num)
+    return f"{puzzle.to_string()},{solution.to_string()},{givens},{nodes},{backtracks},{depth},{grade},{seed}"
+
+
+def generate_chunk(box_size, seeds):
+    return [generate_puzzle(box_size, seed) for seed in seeds]
+
+
+def generate_corpus(output, count, box_size=3, seed=0, workers=None, chunk_size=16, grades=None, max_seeds=None):
+    # Results are written as soon as any chunk finishes. With a grade filter,
+    # new seeds keep being submitted until count matching puzzles are written,
+    # or until max_seeds seeds (default 1000 per puzzle) have been tried.
+    workers = workers or os.cpu_count() or 1
+    last_seed = seed + (max_seeds if max_seeds is not None else 1000 * count)
+    written = generated = 0
+    next_seed = seed
+    start = time.perf_counter()
+
+    output.write("puzzle,solution,givens,nodes,backtracks,max_depth,grade,seed\n")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while written < count:
+            while len(pending) < workers * 2 and next_seed < last_seed:
+                seeds = range(next_seed, min(next_seed + chunk_size, last_seed))
+                next_seed = seeds.stop
+                pending.add(pool.submit(generate_chunk, box_size, seeds))
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for line in future.result():
+                    generated += 1
+                    if written < count and (grades is None or line.split(",")[6] in grades):
+                        output.write(line + "\n")
+                        written += 1
+            output.flush()
+
+        for future in pending:
+            future.cancel()
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written} of {generated} generated puzzles in {elapsed:.1f}s "
+          f"({generated / elapsed:,.2f} puzzles/sec on {workers} workers)", file=sys.stderr)
+    if written < count:
+        raise RuntimeError(f"only {written} of {count} puzzles matched the grades after {generated} seeds; "
+                           f"try other grades or a larger --max-seeds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate unique-solution Sudoku puzzles graded by search effort.")
+    parser.add_argument("count", type=int, help="number of puzzles to write")
+    parser.add_argument("-o", "--output", default="-", help="CSV file, '-' for stdout")
+    parser.add_argument("-b", "--box-size", type=int, default=3, help="3 for 9x9, 4 for 16x16, ...")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="first seed; puzzle i uses seed + i")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=16, help="puzzles per task sent to a worker")
+    parser.add_argument("-g", "--grades", nargs="+", choices=[grade for grade, _, _ in GRADES],
+                        help="only keep puzzles of these grades")
+    parser.add_argument("-m", "--max-seeds", type=int, default=None,
+                        help="give up after this many seeds (default: 1000 per puzzle)")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        generate_corpus(output, args.count, args.box_size, args.seed, args.workers, args.chunk_size, args.grades,
+                        args.max_seeds)
+    except RuntimeError as error:
+        sys.exit(f"Error: {error}")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# At-most-k encodings over integer literals (DIMACS style: v is true, -v is false).
+# Every encoder is a generator of clauses (lists of ints) and takes a VariablePool
+# for the auxiliary variables it introduces.
+
+
+class VariablePool:
+    def __init__(self, top=0):
+        self.top = top  # highest variable in use
+
+    def new_variable(self):
+        self.top += 1
+        return self.top
+
+    def new_variables(self, count):
+        first = self.top + 1
+        self.top += count
+        return list(range(first, first + count))
+
+
+def at_most_one_pairwise(lits, pool=None):
+    # O(n^2) clauses, no auxiliary variables
+    for i in range(len(lits)):
+        for j in range(i + 1, len(lits)):
+            yield [-lits[i], -lits[j]]
+
+
+def at_most_k_sequential(lits, k, pool):
+    # Sinz's sequential counter: s[i][j] means at least j+1 of lits[0..i] are true.
+    # O(n*k) clauses and auxiliary variables.
+    n = len(lits)
+    if k >= n:
+        return
+    if k == 0:
+        for lit in lits:
+            yield [-lit]
+        return
+
+    previous = pool.new_variables(k)
+    yield [-lits[0], previous[0]]
+    for j in range(1, k):
+        yield [-previous[j]]
+
+    for i in range(1, n - 1):
+        current = pool.new_variables(k)
+        yield [-lits[i], current[0]]
+        yield [-previous[0], current[0]]
+        for j in range(1, k):
+            yield [-lits[i], -previous[j - 1], current[j]]
+            yield [-previous[j], current[j]]
+        yield [-lits[i], -previous[k - 1]]
+        previous = current
+
+    yield [-lits[n - 1], -previous[k - 1]]
+
+
+def totalizer(lits, bound, pool, clauses):
+    # Unary count of lits truncated at bound: returns outputs o where o[j] is
+    # forced true whenever at least j+1 lits are true
+    if len(lits) == 1:
+        return list(lits)
+    middle = len(lits) // 2
+    left = totalizer(lits[:middle], bound, pool, clauses)
+    right = totalizer(lits[middle:], bound, pool, clauses)
+    outputs = pool.new_variables(min(len(lits), bound))
+    for a in range(len(left) + 1):
+        for b in range(len(right) + 1):
+            total = a + b
+            if total == 0 or total > len(outputs):
+                continue
+            clause = [outputs[total - 1]]
+            if a:
+                clause.append(-left[a - 1])
+            if b:
+                clause.append(-right[b - 1])
+            clauses.append(clause)
+    return outputs
+
+
+def at_most_k_totalizer(lits, k, pool):
+    # Bailleux and Boufkhad's totalizer, counting only up to k + 1
+    if k >= len(lits):
+        return
+    if k == 0:
+        for lit in lits:
+            yield [-lit]
+        return
+    clauses = []
+    outputs = totalizer(list(lits), k + 1, pool, clauses)
+    yield from clauses
+    yield [-outputs[k]]
+
+
+def comparator(a, b, pool, clauses):
+    # Half comparator for at-most constraints: high >= max(a, b), low >= min(a, b)
+    high, low = pool.new_variable(), pool.new_variable()
+    clauses.append([-a, high])
+    clauses.append([-b, high])
+    clauses.append([-a, -b, low])
+    return high, low
+
+
+def odd_even_merge(a, b, pool, clauses):
+    # Batcher's merge of two sorted (descending) sequences of the same power-of-two length
+    if len(a) == 1:
+        return list(comparator(a[0], b[0], pool, clauses))
+    odd = odd_even_merge(a[0::2], b[0::2], pool, clauses)
+    even = odd_even_merge(a[1::2], b[1::2], pool, clauses)
+    merged = [odd[0]]
+    for i in range(len(a) - 1):
+        merged.extend(comparator(odd[i + 1], even[i], pool, clauses))
+    merged.append(even[-1])
+    return merged
+
+
+def odd_even_sort(lits, pool, clauses):
+    if len(lits) == 1:
+        return list(lits)
+    middle = len(lits) // 2
+    return odd_even_merge(odd_even_sort(lits[:middle], pool, clauses),
+                          odd_even_sort(lits[middle:], pool, clauses), pool, clauses)
+
+
+def at_most_k_network(lits, k, pool):
+    # Cardinality network (Asin et al.): the inputs are split into blocks of m
+    # (the smallest power of two above k), each block is sorted, and the blocks
+    # are merged pairwise keeping only the top m outputs, so O(n log^2 m) clauses
+    if k >= len(lits):
+        return
+    if k == 0:
+        for lit in lits:
+            yield [-lit]
+        return
+
+    m = 1
+    while m <= k:
+        m *= 2
+    padding = -len(lits) % m
+    clauses = []
+    if padding:
+        false = pool.new_variable()
+        clauses.append([-false])
+        lits = list(lits) + [false] * padding
+
+    top = odd_even_sort(list(lits[:m]), pool, clauses)
+    for start in range(m, len(lits), m):
+        block = odd_even_sort(list(lits[start:start + m]), pool, clauses)
+        top = odd_even_merge(top, block, pool, clauses)[:m]
+    yield from clauses
+    yield [-top[k]]
+
+
+def at_most_k_pairwise(lits, k, pool=None):
+    if k >= len(lits):
+        return
+    if k == 0:
+        for lit in lits:
+            yield [-lit]
+        return
+    if k != 1:
+        raise ValueError("the pairwise encoding only handles at most one")
+    yield from at_most_one_pairwise(lits)
+
+
+# name -> at_most_k(lits, k, pool) clause generator
+ENCODINGS = {
+    "pairwise": at_most_k_pairwise,
+    "sequential": at_most_k_sequential,
+    "totalizer": at_most_k_totalizer,
+    "network": at_most_k_network,
+}
@@ -0,0 +1,353 @@
+# Small pure-Python CDCL SAT solver, used when pysat is not installed.
+# Two watched literals, VSIDS branching with phase saving, first-UIP clause
+# learning with non-chronological backjumping and Luby restarts. Learnt clauses
+# are scored by LBD (the number of decision levels among their literals) and the
+# worse half is deleted at a restart or between solves once there are more than max_learnts.
+#
+# Clauses use DIMACS literals (v / -v). Internally literal v is 2v and -v is
+# 2v + 1, so negation is lit ^ 1 and the variable is lit >> 1.
+import heapq
+import time
+
+UNASSIGNED, TRUE, FALSE = 0, 1, -1
+
+
+def luby(i):
+    # i-th element (from 1) of the Luby sequence 1 1 2 1 1 2 4 ...
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CDCLSolver:
+    def __init__(self, clauses=(), restart_unit=100, decay=0.95, max_learnts=2000, learnt_growth=1.1):
+        self.num_variables = 0
+        self.clauses = []
+        self.lbd = []  # per clause: 0 for a problem clause, the LBD of a learnt one
+        self.watches = [[], []]
+        self.value = [UNASSIGNED, UNASSIGNED]  # per internal literal
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        self.seen = [False]
+        self.heap = []
+        self.trail = []
+        self.trail_lim = []
+        self.queue_head = 0
+        self.var_inc = 1.0
+        self.decay = decay
+        self.restart_unit = restart_unit
+        self.max_learnts = max_learnts
+        self.learnt_growth = learnt_growth
+        self.learnts = 0  # learnt clauses currently in self.clauses
+        self.ok = True
+        self.model = None
+        self.core = None  # failed assumptions (DIMACS literals) after an unsatisfiable solve
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.learnt_count = 0
+        self.deleted = 0
+        self.restarts = 0
+        self.elapsed = 0.0
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure_variable(self, variable):
+        while self.num_variables < variable:
+            self.num_variables += 1
+            self.watches += [[], []]
+            self.value += [UNASSIGNED, UNASSIGNED]
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(False)
+            self.seen.append(False)
+            heapq.heappush(self.heap, (0.0, self.num_variables))
+
+    def add_clause(self, clause):
+        # Clauses can only be added at decision level 0 (before or between solves)
+        if not self.ok:
+            return False
+        if self.trail_lim:
+            self.cancel_until(0)
+        lits = []
+        for literal in clause:
+            self.ensure_variable(abs(literal))
+            lit = 2 * literal if literal > 0 else -2 * literal + 1
+            if lit ^ 1 in lits or self.value[lit] == TRUE:
+                return True  # tautology or already satisfied
+            if lit not in lits and self.value[lit] != FALSE:
+                lits.append(lit)
+
+        if not lits:
+            self.ok = False
+            return False
+        if len(lits) == 1:
+            self.enqueue(lits[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+            return self.ok
+        self.attach(lits)
+        return True
+
+    def attach(self, lits, lbd=0):
+        index = len(self.clauses)
+        self.clauses.append(lits)
+        self.lbd.append(lbd)
+        self.watches[lits[0]].append(index)
+        self.watches[lits[1]].append(index)
+        return index
+
+    def reduce_learnts(self):
+        # Only called at decision level 0, where no reason is ever looked at again,
+        # so clauses can be renumbered. Glue clauses (LBD 2 or less) are always kept; of the
+        # others the half with the highest LBD (then the longest) is deleted.
+        candidates = sorted((index for index, lbd in enumerate(self.lbd) if lbd > 2),
+                            key=lambda index: (self.lbd[index], len(self.clauses[index])))
+        drop = set(candidates[len(candidates) // 2:])
+        self.clauses = [clause for index, clause in enumerate(self.clauses) if index not in drop]
+        self.lbd = [lbd for index, lbd in enumerate(self.lbd) if index not in drop]
+        self.watches = [[] for _ in self.watches]
+        for index, clause in enumerate(self.clauses):
+            self.watches[clause[0]].append(index)
+            self.watches[clause[1]].append(index)
+        self.reason = [None] * len(self.reason)
+        self.learnts -= len(drop)
+        self.deleted += len(drop)
+        self.max_learnts = int(self.max_learnts * self.learnt_growth)
+
+    def enqueue(self, lit, reason):
+        self.value[lit] = TRUE
+        self.value[lit ^ 1] = FALSE
+        variable = lit >> 1
+        self.level[variable] = len(self.trail_lim)
+        self.reason[variable] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        # Returns the index of a conflicting clause, or None
+        value, clauses, watches, trail = self.value, self.clauses, self.watches, self.trail
+        while self.queue_head < len(trail):
+            false_lit = trail[self.queue_head] ^ 1
+            self.queue_head += 1
+            self.propagations += 1
+            watching = watches[false_lit]
+            watches[false_lit] = kept = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if value[first] == TRUE:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if value[clause[k]] != FALSE:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if value[first] == FALSE:
+                        kept.extend(watching[position + 1:])
+                        self.queue_head = len(trail)
+                        return index
+                    self.enqueue(first, index)
+        return None
+
+    def bump(self, variable):
+        self.activity[variable] += self.var_inc
+        if self.activity[variable] > 1e100:
+            for v in range(1, self.num_variables + 1):
+                self.activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_variables + 1)
+                         if self.value[2 * v] == UNASSIGNED]
+            heapq.heapify(self.heap)
+        elif self.value[2 * variable] == UNASSIGNED:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def analyze(self, conflict):
+        # First-UIP learning: returns (learnt clause with the asserting literal first, backjump level)
+        seen, level, trail = self.seen, self.level, self.trail
+        current = len(self.trail_lim)
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                variable = q >> 1
+                if not seen[variable] and level[variable] > 0:
+                    seen[variable] = True
+                    self.bump(variable)
+                    if level[variable] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            seen[lit >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[lit >> 1]]
+        learnt[0] = lit ^ 1
+
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the highest remaining level second
+        best = max(range(1, len(learnt)), key=lambda i: level[learnt[i] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def cancel_until(self, target):
+        if len(self.trail_lim) <= target:
+            return
+        start = self.trail_lim[target]
+        for lit in self.trail[start:]:
+            variable = lit >> 1
+            self.value[lit] = self.value[lit ^ 1] = UNASSIGNED
+            self.reason[variable] = None
+            self.polarity[variable] = not lit & 1
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_lim[target:]
+        self.queue_head = len(self.trail)
+
+    def pick_branch(self):
+        heap, value, activity = self.heap, self.value, self.activity
+        while heap:
+            score, variable = heapq.heappop(heap)
+            if value[2 * variable] == UNASSIGNED and -score == activity[variable]:
+                return variable
+        # Stale entries only: fall back to a scan
+        for variable in range(1, self.num_variables + 1):
+            if value[2 * variable] == UNASSIGNED:
+                return variable
+        return None
+
+    def analyze_final(self, failed):
+        # The assumptions that imply the negation of the failed assumption `failed`
+        core = [failed]
+        variable = failed >> 1
+        if self.level[variable] == 0:
+            return core
+        seen = self.seen
+        seen[variable] = True
+        for lit in reversed(self.trail[self.trail_lim[0]:]):
+            variable = lit >> 1
+            if not seen[variable]:
+                continue
+            seen[variable] = False
+            if self.reason[variable] is None:
+                core.append(lit)
+            else:
+                for q in self.clauses[self.reason[variable]][1:]:
+                    if self.level[q >> 1] > 0:
+                        seen[q >> 1] = True
+        return core
+
+    def solve(self, assumptions=()):
+        # assumptions are DIMACS literals that must hold for this call only; when
+        # they cannot all hold, self.core lists a subset of them that conflicts
+        start = time.perf_counter()
+        try:
+            return self.search([2 * lit if lit > 0 else -2 * lit + 1 for lit in assumptions])
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def search(self, assumptions):
+        self.model = None
+        self.core = None
+        for lit in assumptions:
+            self.ensure_variable(lit >> 1)
+        if not self.ok:
+            self.core = []
+            return False
+        if self.propagate() is not None:
+            self.ok = False
+            self.core = []
+            return False
+        if self.learnts > self.max_learnts:
+            self.reduce_learnts()
+
+        restart = 1
+        limit = self.restart_unit * luby(restart)
+        since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    self.core = []
+                    return False
+                learnt, back_level = self.analyze(conflict)
+                lbd = len({self.level[lit >> 1] for lit in learnt})
+                self.cancel_until(back_level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt, lbd))
+                    self.learnt_count += 1
+                    self.learnts += 1
+                self.var_inc /= self.decay
+                continue
+
+            if since_restart >= limit:
+                self.restarts += 1
+                restart += 1
+                limit = self.restart_unit * luby(restart)
+                since_restart = 0
+                self.cancel_until(0)
+                if self.learnts > self.max_learnts:
+                    self.reduce_learnts()
+                continue
+
+            # Assumptions are decided first, one decision level each
+            decision = None
+            while len(self.trail_lim) < len(assumptions):
+                lit = assumptions[len(self.trail_lim)]
+                if self.value[lit] == TRUE:
+                    self.trail_lim.append(len(self.trail))
+                elif self.value[lit] == FALSE:
+                    self.core = [(l >> 1) * (-1 if l & 1 else 1) for l in self.analyze_final(lit)]
+                    self.cancel_until(0)
+                    return False
+                else:
+                    decision = lit
+                    break
+
+            if decision is None:
+                variable = self.pick_branch()
+                if variable is None:
+                    self.model = [v if self.value[2 * v] == TRUE else -v for v in range(1, self.num_variables + 1)]
+                    self.cancel_until(0)
+                    return True
+                decision = 2 * variable if self.polarity[variable] else 2 * variable + 1
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(decision, None)
+
+    def stats(self):
+        rate = self.propagations / self.elapsed if self.elapsed > 0 else 0.0
+        return {"time": self.elapsed, "conflicts": self.conflicts, "decisions": self.decisions,
+                "propagations": self.propagations, "propagations_per_sec": rate,
+                "learnt": self.learnt_count, "deleted": self.deleted, "restarts": self.restarts}
@@ -0,0 +1,241 @@
+# CNF preprocessing, run on the seating formula before it is written or solved:
+# unit propagation, equivalent-literal substitution (the two implications of a
+# required pair make the seats of both guests equivalent, so one guest's
+# variables are replaced by the other's), subsumption and pure-literal
+# elimination. extend() turns a model of the simplified formula back into a
+# model of the original one.
+#
+# Every step is a linear pass over the clauses except subsumption, which is
+# limited to forward checks of clauses up to subsume_length literals: binary
+# subsumers are looked up in a hash set and longer ones through occurrence
+# lists that leave out the (very many) binary clauses.
+from collections import Counter, defaultdict
+from itertools import chain, combinations
+
+
+def count_variables(clauses):
+    return len({abs(literal) for literal in chain.from_iterable(clauses)})
+
+
+def occurrences(clauses):
+    # literal -> indices of the clauses containing it
+    occurs = defaultdict(list)
+    for index, clause in enumerate(clauses):
+        for literal in clause:
+            occurs[literal].append(index)
+    return occurs
+
+
+def normalize(clause):
+    # Sorted clause without duplicate literals, or None for a tautology
+    literals = set(clause)
+    if any(-literal in literals for literal in literals):
+        return None
+    return tuple(sorted(literals, key=abs))
+
+
+def signature(clause):
+    # 64-bit summary of a clause: a subset's bits are a subset of the superset's
+    bits = 0
+    for literal in clause:
+        bits |= 1 << (literal & 63)
+    return bits
+
+
+class Preprocessor:
+    def __init__(self, clauses, subsume_length=8):
+        self.top = 0
+        unique = {}
+        for clause in clauses:
+            clause = normalize(clause)
+            if clause is not None:
+                unique[clause] = None
+                self.top = max(self.top, abs(clause[-1]))
+        self.clauses = list(unique)
+        self.subsume_length = subsume_length
+        self.unsat = False
+        self.fixed = {}  # variable -> value, from unit propagation
+        self.equal = {}  # variable -> literal it was replaced by
+        self.pure = {}  # variable -> value, from pure-literal elimination
+        self.subsumed = 0
+        self.before = (count_variables(self.clauses), len(self.clauses))
+        self.after = self.before
+
+    def run(self):
+        while True:
+            self.propagate()
+            if self.unsat or not self.substitute() or self.unsat:
+                break
+        if not self.unsat:
+            self.subsume()
+            self.eliminate_pure()
+        if self.unsat:
+            self.clauses = [(1,), (-1,)]
+        self.after = (count_variables(self.clauses), len(self.clauses))
+        return [list(clause) for clause in self.clauses]
+
+    def propagate(self):
+        # Fixes the unit clauses one literal at a time. Every clause keeps a count
+        # of its literals that are not false yet; only when that count drops to
+        # one is the clause scanned for its last literal.
+        clauses, value = self.clauses, self.fixed
+        queue = [clause[0] for clause in clauses if len(clause) == 1]
+        if not queue:
+            return
+        occurs = occurrences(clauses)
+        remaining = {}
+        satisfied = set()
+        while queue:
+            literal = queue.pop()
+            if abs(literal) in value:
+                if value[abs(literal)] != (literal > 0):
+                    self.unsat = True
+                    return
+                continue
+            value[abs(literal)] = literal > 0
+            satisfied.update(occurs[literal])
+            for index in occurs[-literal]:
+                if index in satisfied:
+                    continue
+                left = remaining.get(index, len(clauses[index])) - 1
+                remaining[index] = left
+                if left > 1:
+                    continue
+                free = [other for other in clauses[index] if abs(other) not in value]
+                if any(value.get(abs(other)) == (other > 0) for other in clauses[index]):
+                    satisfied.add(index)
+                elif not free:
+                    self.unsat = True
+                    return
+                elif len(free) == 1:
+                    queue.append(free[0])
+
+        for index in remaining:
+            if index not in satisfied:
+                clauses[index] = tuple(literal for literal in clauses[index] if abs(literal) not in value)
+        self.clauses = [clause for index, clause in enumerate(clauses) if index not in satisfied]
+
+    def find(self, literal):
+        # Representative literal of literal's equivalence class
+        while abs(literal) in self.equal:
+            literal = self.equal[abs(literal)] if literal > 0 else -self.equal[abs(literal)]
+        return literal
+
+    def substitute(self):
+        # Binary clauses (a, b) and (-a, -b) together mean a == -b. Each class of
+        # equivalent literals is replaced by the literal of its smallest variable,
+        # so the seats of the lower-numbered guest are kept. Only the clauses that
+        # contain a replaced variable are rewritten. Returns True if anything was merged.
+        binary = {clause for clause in self.clauses if len(clause) == 2}
+        replaced = set()
+        for a, b in binary:
+            if (-a, -b) not in binary:
+                continue
+            first, second = self.find(a), self.find(-b)
+            if first == second:
+                continue
+            if first == -second:
+                self.unsat = True
+                return False
+            if abs(first) < abs(second):
+                first, second = second, first
+            self.equal[abs(first)] = second if first > 0 else -second
+            replaced.update((first, -first))
+        if not replaced:
+            return False
+
+        rewritten = {}
+        for clause in self.clauses:
+            if not replaced.isdisjoint(clause):
+                clause = normalize([self.find(literal) for literal in clause])
+                if clause is None:
+                    continue
+            rewritten[clause] = None
+        self.clauses = list(rewritten)
+        return True
+
+    def subsume(self):
+        # Forward subsumption: a clause of 3..subsume_length literals is removed when
+        # one of its literal pairs is a binary clause, or when a shorter clause of
+        # 3..subsume_length literals (found through the occurrence list of the rarest
+        # literal and filtered by signature) is a subset of it
+        limit = self.subsume_length
+        binary = {clause for clause in self.clauses if len(clause) == 2}
+        indices = sorted((index for index, clause in enumerate(self.clauses) if 3 <= len(clause) <= limit),
+                         key=lambda index: len(self.clauses[index]))
+        occurs = defaultdict(list)
+        signatures = {}
+        for index in indices:
+            clause = self.clauses[index]
+            signatures[index] = signature(clause)
+            for literal in clause:
+                occurs[literal].append(index)
+
+        removed = set()
+        for index in indices:
+            clause = self.clauses[index]
+            if any(pair in binary for pair in combinations(clause, 2)):
+                removed.add(index)
+                continue
+            bits, literals = signatures[index], set(clause)
+            rarest = min(clause, key=lambda literal: len(occurs[literal]))
+            for other in occurs[rarest]:
+                candidate = self.clauses[other]
+                if (other != index and other not in removed and len(candidate) <= len(clause)
+                        and signatures[other] & ~bits == 0 and literals.issuperset(candidate)):
+                    removed.add(index)
+                    break
+        self.subsumed += len(removed)
+        self.clauses = [clause for index, clause in enumerate(self.clauses) if index not in removed]
+
+    def eliminate_pure(self):
+        # A variable that occurs with one sign only can be set to satisfy all its
+        # clauses; removing them can make more literals pure
+        clauses = self.clauses
+        count = Counter(chain.from_iterable(clauses))
+        queue = [literal for literal in count if not count.get(-literal)]
+        if not queue:
+            return
+        occurs = occurrences(clauses)
+        removed = set()
+        while queue:
+            literal = queue.pop()
+            if abs(literal) in self.pure or not count[literal] or count.get(-literal):
+                continue
+            self.pure[abs(literal)] = literal > 0
+            for index in occurs[literal]:
+                if index in removed:
+                    continue
+                removed.add(index)
+                for other in clauses[index]:
+                    count[other] -= 1
+                    if not count[other] and count.get(-other):
+                        queue.append(-other)
+        self.clauses = [clause for index, clause in enumerate(clauses) if index not in removed]
+
+    def extend(self, model):
+        # Model of the original formula from a model (DIMACS literals) of the simplified
+        # one; variables that no clause constrains any more are set false
+        if model is None:
+            return None
+        value = {abs(literal): literal > 0 for literal in model}
+        value.update(self.fixed)
+        value.update(self.pure)
+        top = max(self.top, max(value, default=0))
+        for variable in range(1, top + 1):
+            if variable not in self.equal:
+                value.setdefault(variable, False)
+        for variable in self.equal:
+            literal = self.find(variable)
+            value[variable] = value[abs(literal)] == (literal > 0)
+        return [variable if value[variable] else -variable for variable in range(1, top + 1)]
+
+    def summary(self):
+        (variables, clauses), (variables_after, clauses_after) = self.before, self.after
+        lines = [f"before: {variables} variables, {clauses} clauses",
+                 f"after:  {variables_after} variables, {clauses_after} clauses"]
+        if self.unsat:
+            lines.append("the formula is unsatisfiable")
+        lines.append(f"{len(self.fixed)} fixed by unit propagation, {len(self.equal)} merged as equivalent, "
+                     f"{self.subsumed} subsumed clauses, {len(self.pure)} pure literals")
+        return "\n".join(lines)
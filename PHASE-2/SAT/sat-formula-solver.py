@@ -1,55 +1,114 @@
-from pysat.formula import CNF
+import time
 
+from cdcl import CDCLSolver
+from preprocess import Preprocessor
+from seating import VariableNames, check_seating, decode_seating, seating_clauses, write_dimacs
 
-def generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs):
-    cnf = CNF()
+try:
+    from pysat.solvers import Solver
+except ImportError:
+    Solver = None
 
-    # 1. Each guest must be seated at a table
-    for guest in range(1, num_guests + 1):
-        clause = [(guest - 1) * num_tables + table for table in range(1, num_tables + 1)]
-        cnf.append(clause)
 
-    # 2. Each guest can sit at most at one table
-    for guest in range(1, num_guests + 1):
-        for table1 in range(1, num_tables + 1):
-            for table2 in range(table1 + 1, num_tables + 1):
-                cnf.append([-(guest - 1) * num_tables - table1, -(guest - 1) * num_tables - table2])
+def generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                         guest_encoding="pairwise", capacity_encoding="sequential", symmetry_breaking=False):
+    # Generator of integer clauses, as in sat.py; nothing is held in memory until a solver loads it
+    return seating_clauses(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                           guest_encoding, capacity_encoding, symmetry_breaking=symmetry_breaking)
 
-    # 3. Each table can have at most seats_per_table guests
-    for table in range(1, num_tables + 1):
-        for guest1 in range(1, num_guests + 1):
-            for guest2 in range(guest1 + 1, num_guests + 1):
-                cnf.append([-(guest1 - 1) * num_tables - table, -(guest2 - 1) * num_tables - table])
+def save_formula_to_file(clauses, file_name, num_guests, num_tables, readable_file=None):
+    # DIMACS to file_name, and the "x_guest_table OR -x_..." form to readable_file if given
+    names = VariableNames(num_guests, num_tables, negation="-")
+    return write_dimacs(clauses, file_name, readable_file, names)
+
+
+def solve_with_pysat(clauses, name="glucose3"):
+    with Solver(name=name, bootstrap_with=clauses) as solver:
+        start = time.perf_counter()
+        satisfiable = solver.solve()
+        elapsed = time.perf_counter() - start
+        model = solver.get_model() if satisfiable else None
+        stats = solver.accum_stats() or {}
+    propagations = stats.get("propagations", 0)
+    return model, {"time": elapsed, "conflicts": stats.get("conflicts", 0),
+                   "decisions": stats.get("decisions", 0), "propagations": propagations,
+                   "propagations_per_sec": propagations / elapsed if elapsed > 0 else 0.0}
 
-    # 4. Incompatible pairs cannot sit together
-    for guest1, guest2 in incompatible_pairs:
-        for table in range(1, num_tables + 1):
-            cnf.append([-(guest1 - 1) * num_tables - table, -(guest2 - 1) * num_tables - table])
 
-    # 5. Required pairs must sit together
-    for guest1, guest2 in required_pairs:
-        for table in range(1, num_tables + 1):
-            cnf.append([-(guest1 - 1) * num_tables - table, (guest2 - 1) * num_tables + table])
-            cnf.append([-(guest2 - 1) * num_tables - table, (guest1 - 1) * num_tables + table])
+def solve_with_cdcl(clauses):
+    solver = CDCLSolver(clauses)
+    solver.solve()
+    return solver.model, solver.stats()
 
-    return cnf
 
-def save_formula_to_file(cnf, file_name, num_tables):
-    with open(file_name, 'w') as f:
-        for clause in cnf.clauses:
-            formatted_clause = " OR ".join([f"x_{(abs(literal) - 1) // num_tables + 1}_{(abs(literal) - 1) % num_tables + 1}" if literal > 0 else f"-x_{(abs(literal) - 1) // num_tables + 1}_{(abs(literal) - 1) % num_tables + 1}" for literal in clause])
-            f.write(formatted_clause + "\n")
+def solve_formula(clauses, backend="auto"):
+    # backend is "pysat", "cdcl" or "auto" (pysat when installed, otherwise the built-in solver)
+    if backend == "auto":
+        backend = "pysat" if Solver is not None else "cdcl"
+    if backend == "pysat":
+        if Solver is None:
+            raise ImportError("pysat is not installed; use the cdcl backend")
+        return backend, *solve_with_pysat(clauses)
+    return backend, *solve_with_cdcl(clauses)
+
+
+def print_seating(seating, num_tables):
+    for table in range(1, num_tables + 1):
+        guests = sorted(guest for guest, assigned in seating.items() if assigned == table)
+        print(f"Table {table}: {' '.join(map(str, guests))}")
 
 
 num_guests = 100
 num_tables = 10
 seats_per_table = 10
+guest_encoding = "pairwise"  # at most one table per guest: pairwise, sequential, totalizer or network
+capacity_encoding = "sequential"  # at most seats_per_table guests per table: sequential, totalizer or network
+backend = "auto"  # pysat, cdcl or auto
+solve = True  # False only writes the formula
+symmetry_breaking = True  # only keep seatings whose tables are used in guest order
+preprocess = True  # unit propagation, required-pair merging, subsumption and pure literals
+preprocess_max_seats = 20000  # skip preprocessing above this many guest/table variables
 incompatible_pairs = [(1, 5), (10, 20)]
 required_pairs = [(2, 3), (4, 7)]
 
 
-cnf = generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs)
-file_name = "sat_formula1.txt"
-save_formula_to_file(cnf, file_name, num_tables)
+def formula():
+    return generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                                guest_encoding, capacity_encoding, symmetry_breaking)
+
+
+clauses = formula()
+preprocessor = None
+if preprocess and num_guests * num_tables > preprocess_max_seats:
+    print(f"Skipping preprocessing: {num_guests * num_tables} seat variables > {preprocess_max_seats}")
+elif preprocess:
+    start = time.perf_counter()
+    preprocessor = Preprocessor(clauses)
+    clauses = preprocessor.run()
+    print(f"Preprocessing took {time.perf_counter() - start:.3f}s")
+    print(preprocessor.summary())
+
+file_name = "sat_formula1.cnf"
+readable_file = "sat_formula1.txt"  # None to skip the readable side output
+save_formula_to_file(clauses, file_name, num_guests, num_tables, readable_file)
 
 print(f"SAT Formula is saved in the '{file_name}'.")
+
+if solve:
+    if preprocessor is None:
+        clauses = formula()  # the first generator was used up by the file; stream a fresh one into the solver
+    used, model, stats = solve_formula(clauses, backend)
+    print(f"{used}: {stats['time']:.3f}s, {stats['conflicts']} conflicts, "
+          f"{stats['propagations']} propagations ({stats['propagations_per_sec']:,.0f}/sec)")
+
+    if preprocessor is not None:
+        model = preprocessor.extend(model)
+
+    if model is None:
+        print("No seating satisfies the constraints.")
+    else:
+        seating = decode_seating(model, num_guests, num_tables)
+        print_seating(seating, num_tables)
+        problems = check_seating(seating, num_guests, num_tables, seats_per_table, incompatible_pairs,
+                                 required_pairs)
+        print("Seating is valid." if not problems else "\n".join(problems))
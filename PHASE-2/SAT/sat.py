@@ -1,43 +1,17 @@
-def generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs):
-    formula = []
-
-    # 1. Each guest must be seated at a table
-    for guest in range(1, num_guests + 1):
-        clause = []
-        for table in range(1, num_tables + 1):
-            clause.append(f"x_{guest}_{table}")
-        formula.append(" OR ".join(clause))
-
-    # 2. Each guest can sit at most at one table
-    for guest in range(1, num_guests + 1):
-        for table1 in range(1, num_tables + 1):
-            for table2 in range(table1 + 1, num_tables + 1):
-                formula.append(f"NOT x_{guest}_{table1} OR NOT x_{guest}_{table2}")
-
-    # 3. Each table can have at most seats_per_table guests
-    for table in range(1, num_tables + 1):
-        for guest1 in range(1, num_guests + 1):
-            for guest2 in range(guest1 + 1, num_guests + 1):
-                formula.append(f"NOT x_{guest1}_{table} OR NOT x_{guest2}_{table}")
-
-    # 4. Incompatible pairs cannot sit together
-    for pair in incompatible_pairs:
-        guest1, guest2 = pair
-        for table in range(1, num_tables + 1):
-            formula.append(f"NOT x_{guest1}_{table} OR NOT x_{guest2}_{table}")
-
-    # 5. Required pairs must sit together
-    for pair in required_pairs:
-        guest1, guest2 = pair
-        for table in range(1, num_tables + 1):
-            formula.append(f"NOT x_{guest1}_{table} OR x_{guest2}_{table}")
-            formula.append(f"NOT x_{guest2}_{table} OR x_{guest1}_{table}")
-
-    return formula
+from seating import VariableNames, seating_clauses, write_dimacs
+
+
+def generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                         guest_encoding="pairwise", capacity_encoding="sequential"):
+    # Generator of integer clauses; see seating.seating_clauses for the variable numbering
+    return seating_clauses(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                           guest_encoding, capacity_encoding)
 
 num_guests = 100
 num_tables = 10
 seats_per_table = 10
+guest_encoding = "pairwise"  # at most one table per guest: pairwise, sequential, totalizer or network
+capacity_encoding = "sequential"  # at most seats_per_table guests per table: sequential, totalizer or network
 
 incompatible_pairs = [
     (1, 5),
@@ -49,12 +23,15 @@ required_pairs = [
     (4, 7)
 ]
 
+file_name = "sat_formula.cnf"
+readable_file = "sat_formula.txt"  # "NOT x_guest_table OR ..." side output, None to skip
 
-formula = generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs)
 
+formula = generate_sat_formula(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                               guest_encoding, capacity_encoding)
 
-with open("sat_formula.txt", "w") as file:
-    for clause in formula:
-        file.write(clause + "\n")
+variables, clauses = write_dimacs(formula, file_name, readable_file, VariableNames(num_guests, num_tables))
 
-print("SAT Formula is saved in the file 'sat_formula.txt'.")
\ No newline at end of file
+print(f"SAT Formula ({variables} variables, {clauses} clauses) is saved in the file '{file_name}'.")
+if readable_file:
+    print(f"Readable formula is saved in the file '{readable_file}'.")
@@ -0,0 +1,157 @@
+# Clause generation and streaming output for the wedding seating formula.
+# Variable (guest - 1) * num_tables + table means "guest sits at table";
+# auxiliary variables from the cardinality encodings follow after those.
+from cardinality import ENCODINGS, VariablePool
+
+CHUNK = 10000  # clauses formatted per write call
+
+
+def seat_variable(guest, table, num_tables):
+    return (guest - 1) * num_tables + table
+
+
+def seating_clauses(num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs,
+                    guest_encoding="pairwise", capacity_encoding="sequential", pool=None,
+                    symmetry_breaking=False):
+    # Yields the clauses one at a time, so nothing is held in memory
+    if pool is None:
+        pool = VariablePool(num_guests * num_tables)
+
+    # 1. Each guest must be seated at a table
+    for guest in range(1, num_guests + 1):
+        yield [seat_variable(guest, table, num_tables) for table in range(1, num_tables + 1)]
+
+    # 2. Each guest can sit at most at one table
+    for guest in range(1, num_guests + 1):
+        seats = [seat_variable(guest, table, num_tables) for table in range(1, num_tables + 1)]
+        yield from ENCODINGS[guest_encoding](seats, 1, pool)
+
+    # 3. Each table can have at most seats_per_table guests
+    for table in range(1, num_tables + 1):
+        guests = [seat_variable(guest, table, num_tables) for guest in range(1, num_guests + 1)]
+        yield from ENCODINGS[capacity_encoding](guests, seats_per_table, pool)
+
+    # 4. Incompatible pairs cannot sit together
+    for guest1, guest2 in incompatible_pairs:
+        yield from incompatible_clauses(guest1, guest2, num_tables)
+
+    # 5. Required pairs must sit together
+    for guest1, guest2 in required_pairs:
+        yield from required_clauses(guest1, guest2, num_tables)
+
+    # 6. The tables are interchangeable, so only keep seatings where they are used in order
+    if symmetry_breaking:
+        yield from table_precedence_clauses(num_guests, num_tables, pool)
+
+
+def incompatible_clauses(guest1, guest2, num_tables):
+    for table in range(1, num_tables + 1):
+        yield [-seat_variable(guest1, table, num_tables), -seat_variable(guest2, table, num_tables)]
+
+
+def required_clauses(guest1, guest2, num_tables):
+    for table in range(1, num_tables + 1):
+        yield [-seat_variable(guest1, table, num_tables), seat_variable(guest2, table, num_tables)]
+        yield [-seat_variable(guest2, table, num_tables), seat_variable(guest1, table, num_tables)]
+
+
+def table_precedence_clauses(num_guests, num_tables, pool):
+    # Value precedence over the table labels: a guest may sit at table t > 1 only
+    # if a guest with a smaller number sits at table t - 1, so every seating keeps
+    # exactly one labelling of its tables. used[t][g] (auxiliary) can only be true
+    # when one of guests 1..g+1 sits at table t.
+    used = {}
+    for table in range(1, num_tables):
+        used[table] = pool.new_variables(num_guests - 1)
+        if used[table]:
+            yield [-used[table][0], seat_variable(1, table, num_tables)]
+        for guest in range(2, num_guests):
+            yield [-used[table][guest - 1], used[table][guest - 2], seat_variable(guest, table, num_tables)]
+
+    for table in range(2, num_tables + 1):
+        yield [-seat_variable(1, table, num_tables)]
+        for guest in range(2, num_guests + 1):
+            yield [-seat_variable(guest, table, num_tables), used[table - 1][guest - 2]]
+
+
+class VariableNames:
+    # x_<guest>_<table> for the seating variables, s_<n> for encoding auxiliaries.
+    # The seating names are built once instead of per literal.
+    def __init__(self, num_guests, num_tables, negation="NOT "):
+        self.seats = num_guests * num_tables
+        self.names = [""] + [f"x_{guest}_{table}" for guest in range(1, num_guests + 1)
+                             for table in range(1, num_tables + 1)]
+        self.negation = negation
+
+    def name(self, variable):
+        return self.names[variable] if variable <= self.seats else f"s_{variable}"
+
+    def clause(self, clause):
+        return " OR ".join(self.name(literal) if literal > 0 else self.negation + self.name(-literal)
+                           for literal in clause)
+
+
+def write_dimacs(clauses, file_name, readable_file=None, names=None, buffer_size=1 << 20):
+    # Streams clauses to a DIMACS file, optionally also writing the readable form.
+    # The header is written as a fixed-width placeholder and patched at the end,
+    # once the number of variables and clauses is known.
+    # Returns (variables, clauses written).
+    header_width = 40
+    variables = count = 0
+    readable = open(readable_file, "w", buffering=buffer_size) if readable_file else None
+    try:
+        with open(file_name, "w", buffering=buffer_size) as f:
+            f.write(" " * header_width + "\n")
+            lines, readable_lines = [], []
+            for clause in clauses:
+                count += 1
+                top = max(map(abs, clause))
+                if top > variables:
+                    variables = top
+                lines.append(" ".join(map(str, clause)) + " 0\n")
+                if readable is not None:
+                    readable_lines.append(names.clause(clause) + "\n")
+                if len(lines) == CHUNK:
+                    f.writelines(lines)
+                    lines = []
+                    if readable is not None:
+                        readable.writelines(readable_lines)
+                        readable_lines = []
+            f.writelines(lines)
+            if readable is not None:
+                readable.writelines(readable_lines)
+
+            header = f"p cnf {variables} {count}"
+            if len(header) > header_width:
+                raise ValueError("formula too large for the DIMACS header placeholder")
+            f.seek(0)
+            f.write(header.ljust(header_width))
+    finally:
+        if readable is not None:
+            readable.close()
+    return variables, count
+
+
+def decode_seating(model, num_guests, num_tables):
+    # guest -> table from the true seating variables of a model
+    seating = {}
+    for literal in model:
+        if 0 < literal <= num_guests * num_tables:
+            seating[(literal - 1) // num_tables + 1] = (literal - 1) % num_tables + 1
+    return seating
+
+
+def check_seating(seating, num_guests, num_tables, seats_per_table, incompatible_pairs, required_pairs):
+    # Returns a list of problems, empty when the seating satisfies every constraint
+    problems = [f"guest {guest} has no table" for guest in range(1, num_guests + 1) if guest not in seating]
+    for table in range(1, num_tables + 1):
+        seated = sum(1 for assigned in seating.values() if assigned == table)
+        if seated > seats_per_table:
+            problems.append(f"table {table} has {seated} guests for {seats_per_table} seats")
+    for guest1, guest2 in incompatible_pairs:
+        if seating.get(guest1) is not None and seating.get(guest1) == seating.get(guest2):
+            problems.append(f"incompatible guests {guest1} and {guest2} share table {seating[guest1]}")
+    for guest1, guest2 in required_pairs:
+        if seating.get(guest1) != seating.get(guest2):
+            problems.append(f"guests {guest1} and {guest2} are not at the same table")
+    return problems
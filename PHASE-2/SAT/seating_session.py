@@ -0,0 +1,214 @@
+# Incremental seating: the assignment and capacity clauses are loaded once into
+# a single solver, and every required/incompatible pair is added with its own
+# selector variable s, as the clauses (pair clause OR -s). A solve assumes the
+# selectors of the active pairs, so adding or removing a pair never rebuilds
+# the formula and the solver keeps its learnt clauses between edits. When the
+# active pairs cannot all hold, the failed assumptions name the pairs in conflict.
+import argparse
+import time
+
+from cardinality import ENCODINGS, VariablePool
+from cdcl import CDCLSolver
+from seating import check_seating, decode_seating, incompatible_clauses, required_clauses, seating_clauses
+
+try:
+    from pysat.solvers import Solver
+except ImportError:
+    Solver = None
+
+# kind -> clause generator for (guest1, guest2, num_tables)
+PAIR_CLAUSES = {
+    "incompatible": incompatible_clauses,
+    "required": required_clauses,
+}
+
+
+class PysatSolver:
+    # The subset of the CDCLSolver interface the session uses, on top of pysat
+    def __init__(self, name="glucose3"):
+        self.solver = Solver(name=name)
+        self.model = None
+        self.core = None
+
+    def add_clause(self, clause):
+        self.solver.add_clause(clause)
+
+    def solve(self, assumptions=()):
+        satisfiable = self.solver.solve(assumptions=assumptions)
+        self.model = self.solver.get_model() if satisfiable else None
+        self.core = None if satisfiable else (self.solver.get_core() or [])
+        return satisfiable
+
+    def stats(self):
+        return self.solver.accum_stats() or {}
+
+
+class SeatingSession:
+    def __init__(self, num_guests, num_tables, seats_per_table, guest_encoding="pairwise",
+                 capacity_encoding="sequential", backend="auto", minimize_core=False):
+        if backend == "auto":
+            backend = "pysat" if Solver is not None else "cdcl"
+        if backend == "pysat" and Solver is None:
+            raise ImportError("pysat is not installed; use the cdcl backend")
+        self.backend = backend
+        self.num_guests = num_guests
+        self.num_tables = num_tables
+        self.seats_per_table = seats_per_table
+        self.minimize_core = minimize_core
+        self.pool = VariablePool(num_guests * num_tables)
+        self.solver = PysatSolver() if backend == "pysat" else CDCLSolver()
+        self.pairs = {}  # (kind, guest1, guest2) -> selector variable
+        self.seating = None
+        self.core = []  # conflicting pairs after an unsatisfiable solve
+        self.solves = 0
+        self.last_time = 0.0
+
+        for clause in seating_clauses(num_guests, num_tables, seats_per_table, [], [],
+                                      guest_encoding, capacity_encoding, self.pool):
+            self.solver.add_clause(clause)
+
+    def key(self, kind, guest1, guest2):
+        if kind not in PAIR_CLAUSES:
+            raise ValueError(f"unknown pair kind {kind!r}")
+        for guest in (guest1, guest2):
+            if not 1 <= guest <= self.num_guests:
+                raise ValueError(f"guest {guest} is not between 1 and {self.num_guests}")
+        return kind, min(guest1, guest2), max(guest1, guest2)
+
+    def add(self, kind, guest1, guest2):
+        key = self.key(kind, guest1, guest2)
+        if key not in self.pairs:
+            selector = self.pool.new_variable()
+            for clause in PAIR_CLAUSES[kind](key[1], key[2], self.num_tables):
+                self.solver.add_clause(clause + [-selector])
+            self.pairs[key] = selector
+        return key
+
+    def add_incompatible(self, guest1, guest2):
+        return self.add("incompatible", guest1, guest2)
+
+    def add_required(self, guest1, guest2):
+        return self.add("required", guest1, guest2)
+
+    def remove(self, kind, guest1, guest2):
+        # The selector is switched off for good, which satisfies the pair's
+        # clauses; adding the pair again later gives it a new selector
+        selector = self.pairs.pop(self.key(kind, guest1, guest2), None)
+        if selector is not None:
+            self.solver.add_clause([-selector])
+
+    def incompatible_pairs(self):
+        return [(g1, g2) for kind, g1, g2 in self.pairs if kind == "incompatible"]
+
+    def required_pairs(self):
+        return [(g1, g2) for kind, g1, g2 in self.pairs if kind == "required"]
+
+    def check(self, keys):
+        # Solves with only the given pairs active; returns the pairs of the core on failure
+        self.solves += 1
+        if self.solver.solve([self.pairs[key] for key in keys]):
+            return None
+        owner = {selector: key for key, selector in self.pairs.items()}
+        return [owner[selector] for selector in self.solver.core if selector in owner]
+
+    def solve(self):
+        # Returns the seating (guest -> table), or None with self.core set to the
+        # pairs that cannot all hold (empty when the tables alone are too small)
+        start = time.perf_counter()
+        core = self.check(list(self.pairs))
+        if core is None:
+            self.seating = decode_seating(self.solver.model, self.num_guests, self.num_tables)
+            self.core = []
+        else:
+            self.seating = None
+            self.core = self.shrink(core) if self.minimize_core and core else core
+        self.last_time = time.perf_counter() - start
+        return self.seating
+
+    def shrink(self, core):
+        # Deletion-based minimisation: a pair stays only if the rest are satisfiable without it.
+        # Off by default: every kept pair costs a satisfiable solve, which is slow when the
+        # tables are nearly full, and the failed assumptions are usually small already
+        core = list(core)
+        i = 0
+        while i < len(core):
+            smaller = self.check(core[:i] + core[i + 1:])
+            if smaller is None:
+                i += 1
+            else:
+                kept = set(smaller)
+                core = [key for key in core[:i] if key in kept] + [key for key in core[i + 1:] if key in kept]
+                i = min(i, len(core))
+        return core
+
+    def problems(self):
+        if self.seating is None:
+            return ["no seating"]
+        return check_seating(self.seating, self.num_guests, self.num_tables, self.seats_per_table,
+                             self.incompatible_pairs(), self.required_pairs())
+
+
+def describe(key):
+    kind, guest1, guest2 = key
+    if kind == "required":
+        return f"guests {guest1} and {guest2} must sit together"
+    return f"guests {guest1} and {guest2} cannot sit together"
+
+
+def report(session, edit):
+    seating = session.solve()
+    if seating is not None:
+        problems = session.problems()
+        status = "valid" if not problems else "; ".join(problems)
+        print(f"{edit}: seated in {session.last_time * 1000:.1f} ms ({status})")
+        return
+    print(f"{edit}: unsatisfiable in {session.last_time * 1000:.1f} ms")
+    if not session.core:
+        print("  the tables cannot seat every guest")
+    for key in session.core:
+        print(f"  {describe(key)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental wedding seating with assumption-guarded pairs")
+    parser.add_argument("-g", "--guests", type=int, default=100)
+    parser.add_argument("-t", "--tables", type=int, default=10)
+    parser.add_argument("-s", "--seats", type=int, default=10, help="seats per table")
+    parser.add_argument("--backend", choices=("auto", "pysat", "cdcl"), default="auto")
+    parser.add_argument("--capacity-encoding", choices=sorted(ENCODINGS), default="sequential")
+    parser.add_argument("--minimize-core", action="store_true", help="shrink conflicts to a minimal set of pairs")
+    args = parser.parse_args()
+    if args.capacity_encoding == "pairwise" and args.seats > 1:
+        parser.error("the pairwise encoding only handles one seat per table")
+
+    start = time.perf_counter()
+    session = SeatingSession(args.guests, args.tables, args.seats, capacity_encoding=args.capacity_encoding,
+                             backend=args.backend, minimize_core=args.minimize_core)
+    print(f"{session.backend}: base formula loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for guest1, guest2 in [(1, 5), (10, 20)]:
+        session.add_incompatible(guest1, guest2)
+    for guest1, guest2 in [(2, 3), (4, 7)]:
+        session.add_required(guest1, guest2)
+    report(session, "initial pairs")
+
+    session.add_required(3, 4)
+    report(session, "require 3 with 4")
+    session.add_incompatible(2, 7)
+    report(session, "forbid 2 with 7")
+    session.remove("incompatible", 2, 7)
+    report(session, "allow 2 with 7 again")
+
+    # A chain of required pairs one guest longer than a table
+    chain = range(20, 20 + args.seats)
+    for guest in chain:
+        session.add_required(guest, guest + 1)
+    report(session, f"require guests 20-{20 + args.seats} together")
+    for guest in chain:
+        session.remove("required", guest, guest + 1)
+    report(session, "drop the chain")
+    print(f"{session.solves} solver calls in total", flush=True)
+
+
+if __name__ == "__main__":
+    main()
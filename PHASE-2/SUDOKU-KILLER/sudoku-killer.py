@@ -1,8 +1,86 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "COMMON"))
+from exact_cover import ExactCover
+
 class Cage:
     def __init__(self, sum_value):
         self.cells = []
         self.sum = sum_value
 
+def build_combination_table():
+    # (sum, size) -> bitmasks (bit n for digit n) of every set of distinct digits with that sum
+    table = {}
+    for size in range(1, 10):
+        for digits in combinations(range(1, 10), size):
+            mask = 0
+            for num in digits:
+                mask |= 1 << num
+            table.setdefault((sum(digits), size), []).append(mask)
+    return table
+
+CAGE_COMBINATIONS = build_combination_table()
+
+class CageState:
+    # cell -> cage lookup plus the digits already placed in every cage, kept up to
+    # date on place/remove so a cage check never scans the cage
+    def __init__(self, cages):
+        self.cage_of = {}
+        for index, cage in enumerate(cages):
+            for cell in cage.cells:
+                self.cage_of[cell] = index
+
+        self.combinations = [CAGE_COMBINATIONS.get((cage.sum, len(cage.cells)), []) for cage in cages]
+        self.allowed = []
+        for options in self.combinations:
+            allowed = 0
+            for mask in options:
+                allowed |= mask
+            self.allowed.append(allowed)
+
+        self.targets = [cage.sum for cage in cages]
+        self.sizes = [len(cage.cells) for cage in cages]
+        self.used = [0] * len(cages)
+        self.sums = [0] * len(cages)
+        self.counts = [0] * len(cages)
+
+    def can_place(self, row, col, num):
+        index = self.cage_of.get((row, col))
+        if index is None:
+            return True
+
+        bit = 1 << num
+        if not self.allowed[index] & bit or self.used[index] & bit:
+            return False
+        if self.counts[index] + 1 == self.sizes[index]:
+            return self.sums[index] + num == self.targets[index]
+
+        # The digits placed so far plus num must still extend to a full combination
+        used = self.used[index] | bit
+        return any(mask & used == used for mask in self.combinations[index])
+
+    def place(self, row, col, num):
+        index = self.cage_of.get((row, col))
+        if index is not None:
+            self.used[index] |= 1 << num
+            self.sums[index] += num
+            self.counts[index] += 1
+
+    def remove(self, row, col, num):
+        index = self.cage_of.get((row, col))
+        if index is not None:
+            self.used[index] ^= 1 << num
+            self.sums[index] -= num
+            self.counts[index] -= 1
+
 def is_cell_in_cage(cage, row, col):
     return any(cell[0] == row and cell[1] == col for cell in cage.cells)
 
@@ -26,6 +104,8 @@ def is_valid(board, row, col, num, cages):
             empty_cells = 0
 
             for r, c in cage.cells:
+                if (r, c) != (row, col) and board[r][c] == num:
+                    return False  # digits in a cage are distinct
                 if board[r][c] != 0:
                     current_sum += board[r][c]
                 elif (r, c) != (row, col):
@@ -36,77 +116,551 @@ def is_valid(board, row, col, num, cages):
 
     return True
 
-def solve(board, cages):
+def solve(board, cages, stats=None):
     GRID_SIZE = 9
+    stats = stats if stats is not None else {}
+    stats["nodes"] = 0
+    row_masks = [0] * GRID_SIZE
+    col_masks = [0] * GRID_SIZE
+    box_masks = [0] * GRID_SIZE
+    state = CageState(cages)
+    empty_cells = []
+
     for row in range(GRID_SIZE):
         for col in range(GRID_SIZE):
-            if board[row][col] == 0:
-                for num in range(1, GRID_SIZE + 1):
-                    if is_valid(board, row, col, num, cages):
-                        board[row][col] = num
-
-                        if solve(board, cages):
-                            return True
+            num = board[row][col]
+            box = (row // 3) * 3 + col // 3
+            if num == 0:
+                empty_cells.append((row, col, box))
+                continue
 
-                        board[row][col] = 0
+            bit = 1 << num
+            if (row_masks[row] | col_masks[col] | box_masks[box]) & bit or not state.can_place(row, col, num):
                 return False
-    return True
+            row_masks[row] |= bit
+            col_masks[col] |= bit
+            box_masks[box] |= bit
+            state.place(row, col, num)
+
+    return backtrack(board, empty_cells, 0, row_masks, col_masks, box_masks, state, stats)
+
+def backtrack(board, empty_cells, index, row_masks, col_masks, box_masks, state, stats):
+    stats["nodes"] += 1
+    if index == len(empty_cells):
+        return True
+
+    row, col, box = empty_cells[index]
+    free = 0b1111111110 & ~(row_masks[row] | col_masks[col] | box_masks[box])
+
+    while free:
+        bit = free & -free
+        free ^= bit
+        num = bit.bit_length() - 1
+        if not state.can_place(row, col, num):
+            continue
+
+        board[row][col] = num
+        row_masks[row] |= bit
+        col_masks[col] |= bit
+        box_masks[box] |= bit
+        state.place(row, col, num)
+
+        if backtrack(board, empty_cells, index + 1, row_masks, col_masks, box_masks, state, stats):
+            return True
+
+        row_masks[row] ^= bit
+        col_masks[col] ^= bit
+        box_masks[box] ^= bit
+        state.remove(row, col, num)
+
+    board[row][col] = 0
+    return False
 
 def print_board(board):
     for row in board:
         print(" ".join(map(str, row)))
 
-board = [[0] * 9 for _ in range(9)]
+def placement_columns(row, col, num):
+    box = (row // 3) * 3 + col // 3
+    return [row * 9 + col, 81 + row * 9 + num - 1, 162 + col * 9 + num - 1, 243 + box * 9 + num - 1]
+
+def killer_exact_cover(cages, board=None):
+    # A caged cell is only covered through its cage: one row per assignment of
+    # distinct digits to the cage cells that hits the cage sum, i.e. every
+    # ordering of every digit set in CAGE_COMBINATIONS. Uncaged cells get the
+    # usual nine single-digit rows. A cage of n cells has up to n! rows per digit
+    # set, so very large cages (9 cells: 362,880 rows) make the matrix huge.
+    matrix = ExactCover(324)
+    caged = set()
+
+    for cage in cages:
+        caged.update(cage.cells)
+        for mask in CAGE_COMBINATIONS.get((cage.sum, len(cage.cells)), []):
+            for digits in permutations([num for num in range(1, 10) if mask >> num & 1]):
+                if board and any(board[r][c] and board[r][c] != num for (r, c), num in zip(cage.cells, digits)):
+                    continue
+
+                columns = []
+                for (r, c), num in zip(cage.cells, digits):
+                    columns.extend(placement_columns(r, c, num))
+                matrix.add_row(columns, tuple((r, c, num) for (r, c), num in zip(cage.cells, digits)))
+
+    for row in range(9):
+        for col in range(9):
+            if (row, col) in caged:
+                continue
+            given = board[row][col] if board else 0
+            for num in ([given] if given else range(1, 10)):
+                matrix.add_row(placement_columns(row, col, num), ((row, col, num),))
+
+    return matrix
+
+def solve_dlx(board, cages, stats=None):
+    matrix = killer_exact_cover(cages, board)
+    solution = matrix.solve()
+    if stats is not None:
+        stats["nodes"] = matrix.nodes
+    if solution is None:
+        return False
+
+    for placements in solution:
+        for row, col, num in placements:
+            board[row][col] = num
+    return True
+
+def build_units():
+    rows = [[row * 9 + col for col in range(9)] for row in range(9)]
+    cols = [[row * 9 + col for row in range(9)] for col in range(9)]
+    boxes = [[(box_row + i) * 9 + box_col + j for i in range(3) for j in range(3)]
+             for box_row in range(0, 9, 3) for box_col in range(0, 9, 3)]
+    units = rows + cols + boxes
+    peers = [sorted(set().union(*(unit for unit in units if cell in unit)) - {cell}) for cell in range(81)]
+    return units, peers
+
+UNITS, PEERS = build_units()
+ALL_DIGITS = 0b1111111110
+
+def digit_range(low, high):
+    # Mask of the digits low..high, clipped to 1..9
+    low, high = max(low, 1), min(high, 9)
+    if low > high:
+        return 0
+    return ((1 << (high + 1)) - 1) ^ ((1 << low) - 1)
+
+def shares_unit(cells):
+    return any(all(cell in unit for cell in cells) for unit in UNITS)
+
+def sum_constraints(cages):
+    # Cage constraints plus innie/outie constraints from the 45 rule: in every
+    # row, column and box, the cells not covered by cages lying wholly inside it
+    # sum to 45 minus those cages, and when cages cover the unit completely the
+    # cells sticking out of it sum to the overhanging cages minus that amount.
+    # Each entry is (cells, target, distinct).
+    constraints = [(tuple(r * 9 + c for r, c in cage.cells), cage.sum, True) for cage in cages]
+    cage_cells = [set(cells) for cells, _, _ in constraints]
+    caged = set().union(*cage_cells) if cage_cells else set()
+
+    for unit in UNITS:
+        unit_cells = set(unit)
+        inside = [index for index, cells in enumerate(cage_cells) if cells <= unit_cells]
+        overlapping = [index for index, cells in enumerate(cage_cells)
+                       if cells & unit_cells and not cells <= unit_cells]
+        inside_sum = sum(constraints[index][1] for index in inside)
+        inside_cells = set().union(*(cage_cells[index] for index in inside))
+
+        innies = sorted(unit_cells - inside_cells)
+        if inside and 0 < len(innies) <= 5:
+            constraints.append((tuple(innies), 45 - inside_sum, True))
+
+        if overlapping and unit_cells <= caged:
+            outies = sorted(set().union(*(cage_cells[index] for index in overlapping)) - unit_cells)
+            if len(outies) <= 5:
+                target = sum(constraints[index][1] for index in overlapping) - (45 - inside_sum)
+                constraints.append((tuple(outies), target, shares_unit(outies)))
+
+    return constraints
+
+class KillerPropagationSolver:
+    # Per-cell candidate masks narrowed by the sudoku units and by every sum
+    # constraint (cage combinations plus min/max reachable sums), with
+    # most-constrained-cell branching and trail-based undo.
+    def __init__(self, cages, board=None):
+        self.cells = [0] * 81
+        self.candidates = [ALL_DIGITS] * 81
+        self.constraints = sum_constraints(cages)
+        self.combinations = [CAGE_COMBINATIONS.get((target, len(cells)), []) if distinct else None
+                             for cells, target, distinct in self.constraints]
+        self.constraints_of = [[] for _ in range(81)]
+        for index, (cells, _, _) in enumerate(self.constraints):
+            for cell in cells:
+                self.constraints_of[cell].append(index)
+        self.cage_size = [9] * 81
+        for cage in cages:
+            for r, c in cage.cells:
+                self.cage_size[r * 9 + c] = len(cage.cells)
+
+        self.trail = []
+        self.singles = []
+        self.dirty = set(range(len(self.constraints)))
+        self.nodes = 0
+        self.backtracks = 0
+        self.consistent = all(
+            self.assign(row * 9 + col, board[row][col])
+            for row in range(9) for col in range(9) if board and board[row][col]
+        ) and self.propagate()
+
+    def restrict(self, cell, mask):
+        old = self.candidates[cell]
+        new = old & mask
+        if new == old:
+            return True
+        if not new:
+            return False
+
+        self.trail.append((cell, old, self.cells[cell]))
+        self.candidates[cell] = new
+        self.dirty.update(self.constraints_of[cell])
+        if not new & (new - 1):
+            self.singles.append(cell)
+        return True
+
+    def assign(self, cell, num):
+        bit = 1 << num
+        if self.cells[cell]:
+            return self.cells[cell] == num
+        if not self.restrict(cell, bit):
+            return False
+
+        self.trail.append((cell, bit, 0))
+        self.cells[cell] = num
+        return all(self.restrict(peer, ~bit) for peer in PEERS[cell])
+
+    def narrow(self, index):
+        cells, target, _ = self.constraints[index]
+        candidates = self.candidates
+        masks = [candidates[cell] for cell in cells]
+
+        combinations = self.combinations[index]
+        if combinations is not None:
+            fixed = 0
+            reachable = 0
+            for cell, mask in zip(cells, masks):
+                reachable |= mask
+                if self.cells[cell]:
+                    fixed |= mask
+
+            allowed = 0
+            for combo in combinations:
+                if combo & fixed == fixed and not combo & ~reachable and all(mask & combo for mask in masks):
+                    allowed |= combo
+            if not allowed:
+                return False
+            for cell in cells:
+                if not self.restrict(cell, allowed):
+                    return False
+            masks = [candidates[cell] for cell in cells]
+
+        lows = [(mask & -mask).bit_length() - 1 for mask in masks]
+        highs = [mask.bit_length() - 1 for mask in masks]
+        total_low, total_high = sum(lows), sum(highs)
+        if total_low > target or total_high < target:
+            return False
+
+        for cell, low, high in zip(cells, lows, highs):
+            others_low, others_high = total_low - low, total_high - high
+            if not self.restrict(cell, digit_range(target - others_high, target - others_low)):
+                return False
+        return True
+
+    def hidden_singles(self):
+        placed = 0
+        for unit in UNITS:
+            seen_once = seen_twice = 0
+            for cell in unit:
+                mask = self.candidates[cell]
+                seen_twice |= seen_once & mask
+                seen_once |= mask
+            if seen_once != ALL_DIGITS:
+                return None
+
+            singles = seen_once & ~seen_twice
+            for cell in unit:
+                mask = self.candidates[cell] & singles
+                if mask and not self.cells[cell]:
+                    if mask & (mask - 1) or not self.assign(cell, mask.bit_length() - 1):
+                        return None
+                    placed += 1
+        return placed
+
+    def propagate(self):
+        while True:
+            if self.singles:
+                cell = self.singles.pop()
+                if not self.cells[cell] and not self.assign(cell, self.candidates[cell].bit_length() - 1):
+                    return False
+            elif self.dirty:
+                if not self.narrow(self.dirty.pop()):
+                    return False
+            else:
+                placed = self.hidden_singles()
+                if placed is None:
+                    return False
+                if placed == 0:
+                    return True
+
+    def undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            cell, mask, num = trail.pop()
+            self.candidates[cell] = mask
+            self.cells[cell] = num
+        self.singles.clear()
+        self.dirty.clear()
+
+    def select_cell(self):
+        # Fewest candidates first; ties go to the cell in the smallest cage
+        best_cell = None
+        best_score = (10, 10)
+        for cell in range(81):
+            if self.cells[cell]:
+                continue
+            score = (self.candidates[cell].bit_count(), self.cage_size[cell])
+            if score < best_score:
+                best_cell, best_score = cell, score
+        return best_cell
+
+    def search(self):
+        self.nodes += 1
+        if not self.propagate():
+            return False
+
+        cell = self.select_cell()
+        if cell is None:
+            return True
+
+        free = self.candidates[cell]
+        while free:
+            bit = free & -free
+            free ^= bit
+
+            mark = len(self.trail)
+            if self.assign(cell, bit.bit_length() - 1) and self.search():
+                return True
+
+            self.undo(mark)
+            self.backtracks += 1
+
+        return False
+
+    def solve(self, board):
+        if not self.consistent or not self.search():
+            return False
+
+        for cell in range(81):
+            board[cell // 9][cell % 9] = self.cells[cell]
+        return True
+
+def solve_propagation(board, cages, stats=None):
+    solver = KillerPropagationSolver(cages, board)
+    solved = solver.solve(board)
+    if stats is not None:
+        stats["nodes"] = solver.nodes
+        stats["backtracks"] = solver.backtracks
+    return solved
+
+KILLER_SOLVERS = {
+    "backtracking": solve,
+    "dlx": solve_dlx,
+    "propagation": solve_propagation,
+}
+
+def parse_cell(text):
+    row, col = text.split(",")
+    return int(row), int(col)
+
+def load_puzzles(path):
+    # JSON: {"name": ..., "cages": [{"sum": 10, "cells": [[0, 0], [0, 1]]}, ...]}
+    #       or a list of such objects.
+    # Text: one cage per line as "10: 0,0 0,1"; '#' starts a comment.
+    # Returns a list of (name, cages) pairs.
+    base_name = os.path.splitext(os.path.basename(path))[0]
+
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        entries = data if isinstance(data, list) else [data]
+        puzzles = []
+        for number, entry in enumerate(entries):
+            cages = []
+            for spec in entry["cages"]:
+                cage = Cage(spec["sum"])
+                cage.cells.extend((row, col) for row, col in spec["cells"])
+                cages.append(cage)
+            default_name = base_name if len(entries) == 1 else f"{base_name}-{number + 1}"
+            puzzles.append((entry.get("name", default_name), cages))
+        return puzzles
+
+    cages = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                total, cells = line.split(":", 1)
+                cage = Cage(int(total))
+                cage.cells.extend(parse_cell(cell) for cell in cells.split())
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: expected 'sum: row,col row,col ...'")
+            cages.append(cage)
+    return [(base_name, cages)]
+
+def puzzle_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".json", ".txt")):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+def run_puzzle(name, cages, engine):
+    board = [[0] * 9 for _ in range(9)]
+    stats = {}
+    start = time.perf_counter()
+    solved = KILLER_SOLVERS[engine](board, cages, stats)
+    elapsed = time.perf_counter() - start
+    nodes = stats.get("nodes", 0)
+    rate = nodes / elapsed if elapsed > 0 else 0
+    solution = "".join(str(num) for row in board for num in row) if solved else ""
+    return [name, engine, solved, f"{elapsed:.6f}", nodes, f"{rate:.0f}", solution, ""]
+
+def error_row(name, engine, error):
+    message = f"{type(error).__name__}: {error}"
+    print(f"{name}: {message}", file=sys.stderr)
+    return [name, engine, False, "", 0, "", "", message]
+
+def solve_batch(paths, output, engine="propagation", workers=None):
+    # Puzzles are loaded lazily and timed inside the workers; rows are written in
+    # input order with a bounded number of puzzles in flight. A file that cannot
+    # be read or a puzzle whose solver fails gets an unsolved row with the error
+    # and the batch goes on.
+    workers = workers or os.cpu_count() or 1
+    writer = csv.writer(output)
+    writer.writerow(["puzzle", "engine", "solved", "seconds", "nodes", "nodes_per_sec", "solution", "error"])
+    solved = total = 0
+    start = time.perf_counter()
+
+    def write(row):
+        nonlocal solved, total
+        writer.writerow(row)
+        solved += row[2]
+        total += 1
+
+    def finish(name, future, error):
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as failure:
+                error = failure
+        return error_row(name, engine, error)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()  # (name, future, error), error set for files that did not load
+        for path in puzzle_paths(paths):
+            try:
+                puzzles = load_puzzles(path)
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                pending.append((path, None, error))
+                continue
+            for name, cages in puzzles:
+                pending.append((name, pool.submit(run_puzzle, name, cages, engine), None))
+                while len(pending) >= workers * 4:
+                    write(finish(*pending.popleft()))
+
+        while pending:
+            write(finish(*pending.popleft()))
+
+    print(f"Solved {solved}/{total} killer puzzles in {time.perf_counter() - start:.2f}s "
+          f"with engine '{engine}' on {workers} workers", file=sys.stderr)
+
+def demo_cages():
+    cages = []
+
+    cage1 = Cage(10)
+    cage1.cells.extend([(0, 0), (0, 1)])
+    cages.append(cage1)
+
+    cage2 = Cage(7)
+    cage2.cells.extend([(1, 0), (1, 1)])
+    cages.append(cage2)
 
-cages = []
+    cage3 = Cage(15)
+    cage3.cells.extend([(0, 2), (0, 3), (1, 3)])
+    cages.append(cage3)
 
-cage1 = Cage(10)
-cage1.cells.extend([(0, 0), (0, 1)])
-cages.append(cage1)
+    cage4 = Cage(6)
+    cage4.cells.extend([(1, 2), (2, 2)])
+    cages.append(cage4)
 
-cage2 = Cage(7)
-cage2.cells.extend([(1, 0), (1, 1)])
-cages.append(cage2)
+    cage5 = Cage(20)
+    cage5.cells.extend([(2, 0), (2, 1), (3, 1)])
+    cages.append(cage5)
 
-cage3 = Cage(15)
-cage3.cells.extend([(0, 2), (0, 3), (1, 3)])
-cages.append(cage3)
+    cage6 = Cage(14)
+    cage6.cells.extend([(0, 4), (0, 5), (1, 4)])
+    cages.append(cage6)
 
-cage4 = Cage(6)
-cage4.cells.extend([(1, 2), (2, 2)])
-cages.append(cage4)
+    cage7 = Cage(9)
+    cage7.cells.extend([(1, 5), (2, 5)])
+    cages.append(cage7)
 
-cage5 = Cage(20)
-cage5.cells.extend([(2, 0), (2, 1), (3, 1)])
-cages.append(cage5)
+    cage8 = Cage(12)
+    cage8.cells.extend([(3, 0), (4, 0), (4, 1)])
+    cages.append(cage8)
 
-cage6 = Cage(14)
-cage6.cells.extend([(0, 4), (0, 5), (1, 4)])
-cages.append(cage6)
+    cage9 = Cage(8)
+    cage9.cells.extend([(2, 3), (3, 2)])
+    cages.append(cage9)
 
-cage7 = Cage(9)
-cage7.cells.extend([(1, 5), (2, 5)])
-cages.append(cage7)
+    cage10 = Cage(5)
+    cage10.cells.extend([(3, 3), (3, 4)])
+    cages.append(cage10)
 
-cage8 = Cage(12)
-cage8.cells.extend([(3, 0), (4, 0), (4, 1)])
-cages.append(cage8)
+    cage11 = Cage(17)
+    cage11.cells.extend([(4, 2), (4, 3), (4, 4)])
+    cages.append(cage11)
 
-cage9 = Cage(8)
-cage9.cells.extend([(2, 3), (3, 2)])
-cages.append(cage9)
+    return cages
 
-cage10 = Cage(5)
-cage10.cells.extend([(3, 3), (3, 4)])
-cages.append(cage10)
+def main():
+    parser = argparse.ArgumentParser(description="Solve Killer Sudoku puzzles; without paths, solves the demo puzzle.")
+    parser.add_argument("paths", nargs="*", help="puzzle files (.txt or .json) or directories of them")
+    parser.add_argument("-e", "--engine", choices=sorted(KILLER_SOLVERS), default="propagation")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", default="-", help="CSV file for timings, '-' for stdout")
+    args = parser.parse_args()
 
-cage11 = Cage(17)
-cage11.cells.extend([(4, 2), (4, 3), (4, 4)])
-cages.append(cage11)
+    if args.paths:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+        try:
+            solve_batch(args.paths, output, args.engine, args.workers)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return
 
+    board = [[0] * 9 for _ in range(9)]
+    stats = {}
+    start = time.perf_counter()
+    solved = KILLER_SOLVERS[args.engine](board, demo_cages(), stats)
+    elapsed = time.perf_counter() - start
+    if solved:
+        print("Zgjidhja e Sudoku:")
+        print_board(board)
+    else:
+        print("Nuk ekziston asnjë zgjidhje.")
+    print(f"{stats['nodes']} nodes in {elapsed:.3f}s ({stats['nodes'] / elapsed:,.0f} nodes/sec)")
 
-if solve(board, cages):
-    print("Zgjidhja e Sudoku:")
-    print_board(board)
-else:
-    print("Nuk ekziston asnjë zgjidhje.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()